@@ -1,9 +1,10 @@
 import os
 import json
-import difflib
 import customtkinter as ctk
 import tkinter as tk
 import sys
+from history_store import HistoryStore
+from version_diff import diff_versions, range_changes
 
 def load_json(file_path):
     try:
@@ -27,33 +28,85 @@ def get_version(data):
 def compare_versions(version1, version2):
     return [int(v) for v in version1.split('.')] > [int(v) for v in version2.split('.')]
 
-def compare_json(json1, json2):
-    diff_result = []
-    
-    # Ensure both JSON structures have the same missile entries
-    missiles1 = json1.get("data", {})
-    missiles2 = json2.get("data", {})
-    
-    all_missiles = set(missiles1.keys()).union(missiles2.keys())
-
-    for missile in all_missiles:
-        missile_data1 = missiles1.get(missile, {})
-        missile_data2 = missiles2.get(missile, {})
-        
-        if missile_data1 != missile_data2:
-            diff_result.append(f"\nChanges in missile: {missile}\n")
-            differ = difflib.unified_diff(
-                json.dumps(missile_data1, indent=4).splitlines(keepends=True),
-                json.dumps(missile_data2, indent=4).splitlines(keepends=True),
-                lineterm=''
-            )
-            diff_result.extend(differ)
-
-    return ''.join(diff_result)
-
-def compare_and_merge(file1, file2, output_file):
-    data1 = load_json(file1)
-    data2 = load_json(file2)
+def compare_json(json1, json2, names=None):
+    """Field-level differences (version_diff.VersionDiff) between two compiled infos."""
+    return diff_versions(json1.get("data", {}), json2.get("data", {}), get_version(json1), get_version(json2), names)
+
+def format_value(value):
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return "" if value is None else str(value)
+
+def open_diff_window(master, store, version1, version2):
+    """Table of the field changes between two stored versions, sortable by column (largest change first)."""
+    from tkinter import ttk
+    from job_runner import JobRunner
+
+    json1 = store.load_version(version1)
+    json2 = store.load_version(version2)
+    added, removed, changed = store.changed_missiles(version1, version2)
+    diff = compare_json(json1, json2, changed)
+
+    window = tk.Toplevel(master)
+    window.title(f"Differences {version1} -> {version2}")
+    window.geometry("900x600")
+    summary = tk.Label(window, anchor="w", justify="left")
+    summary.pack(fill="x", padx=10, pady=5)
+
+    columns = ("missile", "field", "old", "new", "delta", "percent")
+    tree = ttk.Treeview(window, columns=columns, show="headings")
+    scrollbar = ttk.Scrollbar(window, orient="vertical", command=tree.yview)
+    tree.configure(yscrollcommand=scrollbar.set)
+    sort_state = {"key": "impact", "reverse": True}
+
+    def fill():
+        tree.delete(*tree.get_children())
+        for change in diff.sorted(sort_state["key"], sort_state["reverse"]):
+            percent = "" if change.percent is None else f"{change.percent:+.1f} %"
+            delta = "" if change.delta is None else f"{change.delta:+.6g}"
+            tree.insert("", "end", values=(change.missile, change.field, format_value(change.old), format_value(change.new), delta, percent))
+        summary.configure(text=f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed_missiles())} changed missiles, "
+                               f"{len(diff.changes)} changed fields")
+
+    def sort_by(column):
+        key = "impact" if column == "percent" else column
+        sort_state["reverse"] = not sort_state["reverse"] if sort_state["key"] == key else key in ("impact", "delta")
+        sort_state["key"] = key
+        fill()
+
+    for column in columns:
+        tree.heading(column, text=column.capitalize(), command=lambda column=column: sort_by(column))
+        tree.column(column, width=200 if column == "missile" else 120)
+
+    runner = JobRunner(window)
+
+    def simulate_ranges():
+        def done(added):
+            range_button.configure(text=f"Range changed for {len(added)} missiles")
+            fill()
+
+        def failed(error):
+            print(f"Error simulating ranges: {error}")
+            range_button.configure(state="normal", text="Simulate range changes")
+
+        def progress(done, total):
+            range_button.configure(text=f"Simulating ranges {done}/{total}")
+
+        range_button.configure(state="disabled")
+        runner.submit(lambda job: range_changes(diff, json1["data"], json2["data"], progress=job.report_progress, cancel_event=job.cancel_event),
+                      done, failed, progress)
+
+    range_button = tk.Button(window, text="Simulate range changes", command=simulate_ranges)
+    range_button.pack(pady=5)
+    scrollbar.pack(side="right", fill="y")
+    tree.pack(fill="both", expand=True, padx=10, pady=5)
+    window.protocol("WM_DELETE_WINDOW", lambda: (runner.shutdown(), window.destroy()))
+    fill()
+    return window
+
+def compare_and_merge(data1, data2, output_file, changed=None):
+    # data1 and data2 are compiled info ({"version": ..., "data": {...}}). changed is the set of missiles
+    # that differ between them when known (history store), the others are equal without comparing them
     merged_data = {}
 
     version1 = get_version(data1)
@@ -73,7 +126,9 @@ def compare_and_merge(file1, file2, output_file):
         merged_data[key] = value
 
     for key, value in data2.items():
-        if key in data1:
+        if key in data1 and changed is not None and key not in changed:
+            merged_data[key] = value
+        elif key in data1:
             existing_value = strip_version(data1[key])
             new_value = strip_version(value)
             if existing_value == new_value:
@@ -94,57 +149,85 @@ def compare_and_merge(file1, file2, output_file):
 
     save_json(output_file, final_output)
 
-def start_comparison():
-    selected_file1 = listbox1.get(tk.ACTIVE)
-    selected_file2 = listbox2.get(tk.ACTIVE)
-    if selected_file1 and selected_file2:
-        file1_path = os.path.join('saves_compiled_info', selected_file1)
-        file2_path = os.path.join('saves_compiled_info', selected_file2)
-        output_file = os.path.join('compiled_info_directory', 'compiled_info.json')
-        # Compare and merge files
-        compare_and_merge(file1_path, file2_path, output_file)
-        # Perform the JSON comparison and display the result
-        print(f"Comparison and merge complete. Saved to {output_file}")
-        print("Restart the program to get the new values...")
-        sys.exit()
-        
-
-def populate_listbox():
-    files = os.listdir('saves_compiled_info')
-    for file in files:
-        listbox1.insert(tk.END, file)
-        listbox2.insert(tk.END, file)
-
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("dark-blue")
-
-root = tk.Tk()
-root.title("Compare Versions")
-root.geometry("600x600")
-
-
-frame = tk.Frame(root)
-frame.pack(pady=20, padx=20, fill="both", expand=True)
-
-listbox_frame = tk.Frame(frame)
-listbox_frame.pack(fill="both", expand=True, padx=10)
-
-listbox1_label = tk.Label(listbox_frame, text="Select first file")
-listbox1_label.pack(pady=5)
-
-listbox1 = tk.Listbox(listbox_frame)
-listbox1.pack(fill="both", expand=True)
-
-listbox2_label = tk.Label(listbox_frame, text="Select second file")
-listbox2_label.pack(pady=5)
-
-listbox2 = tk.Listbox(listbox_frame)
-listbox2.pack(fill="both", expand=True)
-
-populate_listbox()
-
-compare_button = tk.Button(root, text="Compare and Merge", command=start_comparison)
-compare_button.pack(pady=10, padx = 10)
-
-
-root.mainloop()
+def open_compare_window(master=None, on_merged=None):
+    """Window merging two saved versions into compiled_info.json.
+
+    Given the main window as master it opens as a Toplevel and calls
+    on_merged() after a merge so the data can be reloaded. Without a
+    master it runs standalone and exits after the merge.
+    """
+    if master is None:
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("dark-blue")
+        root = tk.Tk()
+    else:
+        root = tk.Toplevel(master)
+    root.title("Compare Versions")
+    root.geometry("600x600")
+
+    store = HistoryStore()
+
+    def start_comparison():
+        selected_version1 = listbox1.get(tk.ACTIVE)
+        selected_version2 = listbox2.get(tk.ACTIVE)
+        if selected_version1 and selected_version2:
+            output_file = os.path.join('compiled_info_directory', 'compiled_info.json')
+            added, removed, changed = store.changed_missiles(selected_version1, selected_version2)
+            print(f"{selected_version1} -> {selected_version2}: {len(added)} added, {len(removed)} removed, {len(changed)} changed")
+            # Compare and merge the versions
+            compare_and_merge(store.load_version(selected_version1), store.load_version(selected_version2), output_file, set(changed))
+            # Perform the JSON comparison and display the result
+            print(f"Comparison and merge complete. Saved to {output_file}")
+            if on_merged is None:
+                print("Restart the program to get the new values...")
+                sys.exit()
+            root.destroy()
+            on_merged()
+
+    def populate_listbox():
+        # Full copies saved before the history store are added to it once
+        if os.path.isdir('saves_compiled_info'):
+            for version in store.import_saves('saves_compiled_info'):
+                print(f"Added saved version {version} to {store.directory}")
+        for version in store.versions():
+            listbox1.insert(tk.END, version)
+            listbox2.insert(tk.END, version)
+
+    frame = tk.Frame(root)
+    frame.pack(pady=20, padx=20, fill="both", expand=True)
+
+    listbox_frame = tk.Frame(frame)
+    listbox_frame.pack(fill="both", expand=True, padx=10)
+
+    listbox1_label = tk.Label(listbox_frame, text="Select first version")
+    listbox1_label.pack(pady=5)
+
+    listbox1 = tk.Listbox(listbox_frame)
+    listbox1.pack(fill="both", expand=True)
+
+    listbox2_label = tk.Label(listbox_frame, text="Select second version")
+    listbox2_label.pack(pady=5)
+
+    listbox2 = tk.Listbox(listbox_frame)
+    listbox2.pack(fill="both", expand=True)
+
+    populate_listbox()
+
+    compare_button = tk.Button(root, text="Compare and Merge", command=start_comparison)
+    compare_button.pack(pady=10, padx = 10)
+
+    def show_differences():
+        selected_version1 = listbox1.get(tk.ACTIVE)
+        selected_version2 = listbox2.get(tk.ACTIVE)
+        if selected_version1 and selected_version2:
+            open_diff_window(root, store, selected_version1, selected_version2)
+
+    differences_button = tk.Button(root, text="Show Differences", command=show_differences)
+    differences_button.pack(pady=(0, 10), padx = 10)
+
+    if master is None:
+        root.mainloop()
+    return root
+
+if __name__ == "__main__":
+    open_compare_window()
@@ -3,8 +3,12 @@ import re
 import math
 import numpy as np
 import json
-import shutil
-from find_name import find_weapon_name
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from catalogue import save_catalogue
+from history_store import HistoryStore
+import instrumentation
 
 def get_first_value(value):
     if isinstance(value, list):
@@ -19,15 +23,17 @@ def load_version(version_file_path):
         print(f"Error reading version file {version_file_path}: {e}")
         return 'unknown_version'
 
-def extract_info(file_path, version):
+def extract_info(file_path, version, errors=None):
+    # Error messages are appended to errors when given, printed otherwise
+    report = errors.append if errors is not None else print
     try:
         with open(file_path, 'r') as file:
             data = json.load(file)
     except json.JSONDecodeError as e:
-        print(f"Error decoding JSON in file {file_path}: {e}")
+        report(f"Error decoding JSON in file {file_path}: {e}")
         return None
     except Exception as e:
-        print(f"Error reading file {file_path}: {e}")
+        report(f"Error reading file {file_path}: {e}")
         return None
     
     try:
@@ -128,10 +134,67 @@ def extract_info(file_path, version):
             "guidance_timeout": guidance_timeout,
         }
     except Exception as e:
-        print(f"Error processing file {file_path}: {e}")
+        report(f"Error processing file {file_path}: {e}")
         return None
 
-def list_blk_files(directory, compiled_dir, version):
+def _extract_chunk(file_paths, version):
+    results = []
+    for file_path in file_paths:
+        errors = []
+        results.append((extract_info(file_path, version, errors), errors))
+    return results
+
+def extract_all(file_paths, version, max_workers=None, chunk_size=32):
+    """extract_info for every file, spread over a process pool in chunks of chunk_size.
+
+    Returns the infos in the order of file_paths and a list of (file_path, message) errors.
+    """
+    chunks = [file_paths[start:start + chunk_size] for start in range(0, len(file_paths), chunk_size)]
+    if max_workers == 1 or len(chunks) <= 1:
+        chunk_results = [_extract_chunk(chunk, version) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            chunk_results = list(executor.map(_extract_chunk, chunks, [version] * len(chunks)))
+
+    infos = []
+    errors = []
+    for file_path, (info, file_errors) in zip(file_paths, chain.from_iterable(chunk_results)):
+        infos.append(info)
+        errors.extend((file_path, message) for message in file_errors)
+    return infos, errors
+
+# Bump when extract_info changes so old manifests are ignored
+MANIFEST_VERSION = 1
+
+def file_hash(file_path):
+    with open(file_path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+def load_manifest(manifest_file):
+    """file path -> {"mtime", "size", "hash", "info"} of the last compile, empty if missing or outdated."""
+    try:
+        with open(manifest_file, 'r') as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Error reading manifest {manifest_file}: {e}")
+        return {}
+    if manifest.get("manifest_version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+def save_manifest(manifest_file, files):
+    temporary_file = manifest_file + '.tmp'
+    try:
+        with open(temporary_file, 'w') as file:
+            json.dump({"manifest_version": MANIFEST_VERSION, "files": files}, file)
+        os.replace(temporary_file, manifest_file)
+    except Exception as e:
+        print(f"Error saving manifest {manifest_file}: {e}")
+
+def list_blk_files(directory, compiled_dir, version, max_workers=None, changed_files=None):
+    # changed_files: paths known to have changed (e.g. from a git update), other files in the manifest are reused without a stat
     print(f'Loading information from {directory}')
     if not os.path.isdir(directory):
         print(f"Error: Directory {directory} does not exist.")
@@ -139,20 +202,71 @@ def list_blk_files(directory, compiled_dir, version):
 
     compiled_file = os.path.join(compiled_dir, 'compiled_info.json')
     
+    # Imported here so the pool workers don't load the language files
+    from find_name import find_weapon_name
+
+    # Sorted so the output doesn't depend on the directory listing order
+    scan_start = instrumentation.start()
+    filenames = sorted(filename for filename in os.listdir(directory) if filename.endswith(('.blkx', '.blk')))
+
+    # Only files whose size/mtime and then content changed since the last compile are extracted again,
+    # deleted files drop out because the new manifest is built from the current listing
+    manifest_file = os.path.join(compiled_dir, 'manifest.json')
+    old_manifest = load_manifest(manifest_file)
+    manifest = {}
+    changed = []
+    known_changes = None if changed_files is None else {os.path.normpath(path) for path in changed_files}
+    for filename in filenames:
+        file_path = os.path.join(directory, filename)
+        entry = old_manifest.get(file_path)
+        if entry and known_changes is not None and os.path.normpath(file_path) not in known_changes:
+            manifest[file_path] = entry
+            continue
+        try:
+            stat = os.stat(file_path)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                manifest[file_path] = entry
+                continue
+            content_hash = file_hash(file_path)
+        except OSError as e:
+            print(f"Error reading file {file_path}: {e}")
+            continue
+        if entry and entry["hash"] == content_hash:
+            manifest[file_path] = dict(entry, mtime=stat.st_mtime, size=stat.st_size)
+        else:
+            manifest[file_path] = {"mtime": stat.st_mtime, "size": stat.st_size, "hash": content_hash, "info": None}
+            changed.append(file_path)
+
+    print(f"{len(changed)} of {len(filenames)} files changed, {len(set(old_manifest) - set(manifest))} removed")
+    instrumentation.record("scan manifest", scan_start, files=len(filenames))
+    with instrumentation.span("extract", files=len(changed)):
+        infos, errors = extract_all(changed, version, max_workers)
+    for file_path, info in zip(changed, infos):
+        manifest[file_path]["info"] = info
+    for file_path, message in errors:
+        print(message)
+        # Retried on the next update
+        manifest.pop(file_path, None)
+    if errors:
+        print(f"{len(errors)} of {len(filenames)} files could not be read")
+
+    names_start = instrumentation.start()
     blk_files_info = {}
-    for filename in os.listdir(directory):
-        if filename.endswith(('.blkx', '.blk')):
-            file_path = os.path.join(directory, filename)
+    for filename in filenames:
+        file_path = os.path.join(directory, filename)
+        info = manifest[file_path]["info"] if file_path in manifest else None
+        if info:
             try:
-                info = extract_info(file_path, version)
                 file_name = filename.rsplit('.', 1)[0]
                 name = find_weapon_name(file_name)
-                if info:
-                    blk_files_info[name] = info
+                blk_files_info[name] = info
             except Exception as e:
                 print(f"Error processing {file_path}: {e}")
 
+    instrumentation.record("weapon names", names_start, files=len(filenames))
+
     # Save the extracted information to the compiled file along with the version
+    save_start = instrumentation.start()
     try:
         os.makedirs(compiled_dir, exist_ok=True)
         output_data = {
@@ -162,22 +276,36 @@ def list_blk_files(directory, compiled_dir, version):
         with open(compiled_file, 'w') as file:
             json.dump(output_data, file, indent=4)
             print(f"Saved compiled information to {compiled_file}")
+        save_manifest(manifest_file, manifest)
+        # The GUI loads this memory-mapped copy, the JSON stays as the export
+        save_catalogue(os.path.join(compiled_dir, 'catalogue'), version, blk_files_info, compiled_file)
+
+        # Keep this version in the history used by the version compare, records shared with other versions are stored once
+        store = HistoryStore()
+        new_records = store.add_version(version, blk_files_info)
+        print(f"Saved version {version} to {store.directory} ({new_records} new records)")
 
-        # Copy the compiled file to the 'saves compiled info' directory with version in the filename
-        save_dir = 'saves_compiled_info'
-        os.makedirs(save_dir, exist_ok=True)
-        versioned_file_name = f'compiled_info_{version}.json'
-        shutil.copy(compiled_file, os.path.join(save_dir, versioned_file_name))
-        print(f"Copied compiled file to {os.path.join(save_dir, versioned_file_name)}")
-        
     except Exception as e:
         print(f"Error saving compiled info to {compiled_file}: {e}")
 
+    instrumentation.record("save compiled info", save_start)
     return blk_files_info
 
 directory = 'rocketguns_json/aces.vromfs.bin_u/gamedata/weapons/rocketguns'
-units_path = 'rocketguns_json/lang/lang.vromfs.bin_u/lang/units_weaponry.csv'
+units_path = 'rocketguns_json/lang.vromfs.bin_u/lang/units_weaponry.csv'
 compiled_dir = 'compiled_info_directory'
 version_file_path = 'rocketguns_json/aces.vromfs.bin_u/version'
-version = load_version(version_file_path)
-blk_files_info = list_blk_files(directory, compiled_dir, version)
\ No newline at end of file
+
+def dump(max_workers=None, changed_files=None):
+    """Compile the datamine's rocketguns into compiled_info_directory/compiled_info.json.
+
+    changed_files are paths relative to rocketguns_json, as returned by git_clone.update_repo.
+    """
+    version = load_version(version_file_path)
+    if changed_files is not None:
+        changed_files = [os.path.join('rocketguns_json', path) for path in changed_files]
+    return list_blk_files(directory, compiled_dir, version, max_workers, changed_files)
+
+# Pool workers import this module, only a direct run dumps
+if __name__ == "__main__":
+    blk_files_info = dump()
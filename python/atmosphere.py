@@ -0,0 +1,142 @@
+import numpy as np
+
+# Conversion table (altitude in m: [TAS km/h, IAS km/h, Mach])
+conversion_table = {
+    0: [1224, 1224, 1],
+    1000: [1224, 1167, 1.01],
+    2000: [1224, 1110, 1.02],
+    3000: [1224, 1060, 1.04],
+    4000: [1224, 1000, 1.05],
+    5000: [1224, 950, 1.06],
+    6000: [1224, 900, 1.07],
+    7000: [1224, 850, 1.09],
+    8000: [1224, 800, 1.1],
+    9000: [1224, 750, 1.12],
+    10000: [1224, 700, 1.13],
+    11000: [1224, 670, 1.14],
+    12000: [1224, 625, 1.16],
+    13000: [1224, 580, 1.17],
+    14000: [1224, 544, 1.17],
+    15000: [1224, 500, 1.18],
+    16000: [1224, 465, 1.18],
+    17000: [1224, 425, 1.17],
+    18000: [1224, 390, 1.15],
+    19000: [1224, 370, 1.15],
+    20000: [1224, 360, 1.15],
+}
+
+altitudes = list(conversion_table.keys())
+tas_values = [conversion_table[alt][0] for alt in altitudes]
+ias_values = [conversion_table[alt][1] for alt in altitudes]
+mach_values = [conversion_table[alt][2] for alt in altitudes]
+speed_of_sound_values = [1224 / mach for mach in mach_values]
+
+# Air density used for the drag computation
+rho_altitudes = [0, 1000, 2000, 3000, 5000, 8000, 10000, 12000, 15000, 20000]
+rho_values = [0.56, 0.53, 0.49, 0.44, 0.365, 0.3, 0.27, 0.23, 0.19, 0.15]
+
+MIN_ALTITUDE = altitudes[0]
+MAX_ALTITUDE = altitudes[-1]
+
+# Resolution of the dense tables (m). Every breakpoint of the source tables is a
+# multiple of this step, so linear interpolation between two dense samples gives
+# the same value as interpolating the source tables directly.
+TABLE_STEP = 1.0
+
+table_altitudes = np.arange(MIN_ALTITUDE, MAX_ALTITUDE + TABLE_STEP, TABLE_STEP)
+ias_ratio_table = np.interp(table_altitudes, altitudes, ias_values) / 1224
+speed_of_sound_table = np.interp(table_altitudes, altitudes, speed_of_sound_values)
+rho_table = np.interp(table_altitudes, rho_altitudes, rho_values)
+
+# Slopes of the first and last rho segments, used to extrapolate outside the table
+_rho_slope_low = (rho_values[1] - rho_values[0]) / (rho_altitudes[1] - rho_altitudes[0])
+_rho_slope_high = (rho_values[-1] - rho_values[-2]) / (rho_altitudes[-1] - rho_altitudes[-2])
+
+# Plain lists are faster than numpy arrays for the scalar lookups
+_ias_ratio_list = ias_ratio_table.tolist()
+_speed_of_sound_list = speed_of_sound_table.tolist()
+_rho_list = rho_table.tolist()
+_last_index = len(table_altitudes) - 1
+
+
+def _lookup(table, altitude):
+    position = (altitude - MIN_ALTITUDE) / TABLE_STEP
+    index = int(position)
+    if index >= _last_index:
+        return table[_last_index]
+    low = table[index]
+    return low + (position - index) * (table[index + 1] - low)
+
+def _lookup_array(table, altitude):
+    position = (altitude - MIN_ALTITUDE) / TABLE_STEP
+    index = np.minimum(position.astype(np.intp), _last_index - 1)
+    low = table[index]
+    return low + (position - index) * (table[index + 1] - low)
+
+def _check_bounds(altitude):
+    if altitude < MIN_ALTITUDE or altitude > MAX_ALTITUDE:
+        raise ValueError("Altitude out of bounds for interpolation")
+
+def _check_bounds_array(altitude):
+    if altitude.size and (altitude.min() < MIN_ALTITUDE or altitude.max() > MAX_ALTITUDE):
+        raise ValueError("Altitude out of bounds for interpolation")
+
+
+# Scalar API
+
+def rho(altitude):
+    """Air density at the given altitude, linearly extrapolated outside the table."""
+    if altitude < MIN_ALTITUDE:
+        return rho_values[0] + (altitude - MIN_ALTITUDE) * _rho_slope_low
+    if altitude > MAX_ALTITUDE:
+        return rho_values[-1] + (altitude - MAX_ALTITUDE) * _rho_slope_high
+    return _lookup(_rho_list, altitude)
+
+def ias_ratio(altitude):
+    """IAS/TAS ratio at the given altitude."""
+    _check_bounds(altitude)
+    return _lookup(_ias_ratio_list, altitude)
+
+def speed_of_sound(altitude):
+    """Speed of sound (km/h) at the given altitude."""
+    _check_bounds(altitude)
+    return _lookup(_speed_of_sound_list, altitude)
+
+def tas_to_ias(tas, altitude):
+    return tas * ias_ratio(altitude)
+
+def ias_to_tas(ias, altitude):
+    return ias / ias_ratio(altitude)
+
+def get_mach_number(tas, altitude):
+    return tas / speed_of_sound(altitude)
+
+
+# Array API
+
+def rho_array(altitude):
+    altitude = np.asarray(altitude, dtype=float)
+    clipped = np.clip(altitude, MIN_ALTITUDE, MAX_ALTITUDE)
+    result = _lookup_array(rho_table, clipped)
+    result = np.where(altitude < MIN_ALTITUDE, rho_values[0] + (altitude - MIN_ALTITUDE) * _rho_slope_low, result)
+    result = np.where(altitude > MAX_ALTITUDE, rho_values[-1] + (altitude - MAX_ALTITUDE) * _rho_slope_high, result)
+    return result
+
+def ias_ratio_array(altitude):
+    altitude = np.asarray(altitude, dtype=float)
+    _check_bounds_array(altitude)
+    return _lookup_array(ias_ratio_table, altitude)
+
+def speed_of_sound_array(altitude):
+    altitude = np.asarray(altitude, dtype=float)
+    _check_bounds_array(altitude)
+    return _lookup_array(speed_of_sound_table, altitude)
+
+def tas_to_ias_array(tas, altitude):
+    return np.asarray(tas, dtype=float) * ias_ratio_array(altitude)
+
+def ias_to_tas_array(ias, altitude):
+    return np.asarray(ias, dtype=float) / ias_ratio_array(altitude)
+
+def mach_number_array(tas, altitude):
+    return np.asarray(tas, dtype=float) / speed_of_sound_array(altitude)
@@ -0,0 +1,202 @@
+import os
+import sys
+import csv
+import json
+import fnmatch
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from graph_maker_missile import compute_dependent_variables
+from catalogue import load_catalogue
+from missile_profile import build_profiles
+from batch_simulation import simulate_batch, use_batch, split_batches
+from envelope_sweep import SWEEP_AXES
+from stop_conditions import parse_stop_conditions
+
+# Headless batch simulation: no Tk, no matplotlib.
+#   python batch_simulate.py --missiles "AIM-9*" --scenario 1224,1000,0,0,1000 --output results.csv
+#   Launch conditions are in the GUI units: speeds in km/h, altitudes in m, initial_target_distance in km (0 is no target).
+#   --stop intercept closing ground ends each flight early, range and time_of_flight are then measured up to the stop.
+SUMMARY_FIELDS = ["missile", "scenario"] + SWEEP_AXES + ["range", "time_of_flight", "time_to_target", "peak_mach", "impact_speed", "error"]
+DEFAULT_SCENARIO = {"name": "default", "start_speed": 1224.0, "launch_altitude": 1000.0, "target_speed": 0.0, "initial_target_distance": 0.0, "target_altitude": 1000.0}
+
+def summarize(results, initial_target_distance):
+    """Summary metrics of one compute_dependent_variables result.
+
+    Impact speed is the speed when the target is reached, or at the end of
+    the flight if it never is (or there is no target). Distances in m,
+    times in s, speeds in m/s.
+    """
+    times = results[0]
+    tas_speed = results[3]
+    mach_numbers = results[4]
+    horizontal_distances = results[7]
+    target_distances = results[9]
+    # Without a target the target distances are all 0 and would count as reached at launch
+    reached = np.flatnonzero(horizontal_distances >= target_distances) if initial_target_distance > 0 else np.array([], dtype=int)
+    impact = reached[0] if reached.size else len(times) - 1
+    return {
+        "range": float(horizontal_distances[-1]),
+        "time_of_flight": float(times[-1]),
+        "time_to_target": float(times[reached[0]]) if reached.size else None,
+        "peak_mach": float(np.max(mach_numbers)),
+        "impact_speed": float(tas_speed[impact]),
+    }
+
+def simulate_pair(profile, scenario, integrator="fixed", stop=None):
+    """One output row: the summary of profile flown in scenario, or the error that stopped it."""
+    row = {"missile": profile.name, "scenario": scenario["name"]}
+    row.update((axis, scenario[axis]) for axis in SWEEP_AXES)
+    try:
+        results = compute_dependent_variables(profile, *(scenario[axis] for axis in SWEEP_AXES), integrator=integrator, stop=stop)
+        row.update(summarize(results, scenario["initial_target_distance"]))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+def _simulate_pairs(pairs, integrator, stop):
+    return [simulate_pair(profile, scenario, integrator, stop) for profile, scenario in pairs]
+
+def simulate_scenario(profiles, scenario, stop=None):
+    """The output rows of profiles flown together in scenario by simulate_batch (fixed-step integrator)."""
+    try:
+        batch = simulate_batch(profiles, *(scenario[axis] for axis in SWEEP_AXES), stop=stop)
+    except Exception:
+        # One flight at a time, each row gets its own error
+        return [simulate_pair(profile, scenario, stop=stop) for profile in profiles]
+    rows = []
+    for profile, left_tables, results in zip(profiles, batch["left_tables"], batch["series"]):
+        if left_tables:
+            # compute_dependent_variables gives the error of the flight
+            rows.append(simulate_pair(profile, scenario, stop=stop))
+            continue
+        row = {"missile": profile.name, "scenario": scenario["name"]}
+        row.update((axis, scenario[axis]) for axis in SWEEP_AXES)
+        row.update(summarize(results, scenario["initial_target_distance"]))
+        rows.append(row)
+    return rows
+
+def _simulate_batches(profiles, scenarios, stop):
+    # Rows per profile then scenario, like _simulate_pairs
+    rows = [simulate_scenario(profiles, scenario, stop) for scenario in scenarios]
+    return [rows[k][j] for j in range(len(profiles)) for k in range(len(scenarios))]
+
+def parse_scenario(text, number):
+    """Scenario from "start_speed,launch_altitude,target_speed,initial_target_distance,target_altitude"."""
+    values = [float(value) for value in text.split(',')]
+    if len(values) != len(SWEEP_AXES):
+        raise ValueError(f"Scenario '{text}' needs {len(SWEEP_AXES)} values: {','.join(SWEEP_AXES)}")
+    return dict(zip(SWEEP_AXES, values), name=f"scenario{number}")
+
+def load_scenarios(file_path):
+    """Scenarios of a .json list of objects or a .csv file with a header, keyed by the SWEEP_AXES names.
+
+    Missing conditions take the GUI defaults, "name" is optional.
+    """
+    with open(file_path, 'r', newline='') as file:
+        if file_path.endswith('.json'):
+            rows = json.load(file)
+        else:
+            rows = list(csv.DictReader(file))
+
+    scenarios = []
+    for number, row in enumerate(rows, 1):
+        scenario = dict(DEFAULT_SCENARIO, name=row.get("name") or f"scenario{number}")
+        for axis in SWEEP_AXES:
+            if row.get(axis) not in (None, ""):
+                scenario[axis] = float(row[axis])
+        scenarios.append(scenario)
+    return scenarios
+
+def select_profiles(profiles, patterns):
+    """Profiles whose name matches one of the glob patterns (case-insensitive), in catalogue order."""
+    if not patterns:
+        return list(profiles.values())
+    patterns = [pattern.lower() for pattern in patterns]
+    return [profile for name, profile in profiles.items() if any(fnmatch.fnmatchcase(name.lower(), pattern) for pattern in patterns)]
+
+class RowWriter:
+    """Writes result rows to CSV or JSON lines as they arrive."""
+
+    def __init__(self, file, output_format):
+        self.file = file
+        self.output_format = output_format
+        if output_format == "csv":
+            self.writer = csv.DictWriter(file, SUMMARY_FIELDS, lineterminator='\n')
+            self.writer.writeheader()
+
+    def write(self, row):
+        if self.output_format == "csv":
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + '\n')
+        self.file.flush()
+
+def run_batch(profiles, scenarios, write, max_workers=None, chunk_size=8, integrator="fixed", stop=None):
+    """Simulate every (profile, scenario) pair in a process pool and call write(row) in order as rows complete. Returns the number of failed pairs.
+
+    Without the Numba kernel, many missiles are flown together per scenario by simulate_batch.
+    """
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        if use_batch(len(profiles), integrator):
+            batches = split_batches(profiles)
+            chunk_rows = executor.map(_simulate_batches, batches, [scenarios] * len(batches), [stop] * len(batches))
+        else:
+            pairs = [(profile, scenario) for profile in profiles for scenario in scenarios]
+            chunks = [pairs[start:start + chunk_size] for start in range(0, len(pairs), chunk_size)]
+            chunk_rows = executor.map(_simulate_pairs, chunks, [integrator] * len(chunks), [stop] * len(chunks))
+        for rows in chunk_rows:
+            for row in rows:
+                if "error" in row:
+                    failed += 1
+                    print(f"{row['missile']} / {row['scenario']}: {row['error']}", file=sys.stderr)
+                write(row)
+    return failed
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate compiled missiles over a list of launch scenarios without the GUI")
+    parser.add_argument("--compiled-dir", default="compiled_info_directory", help="directory of compiled_info.json")
+    parser.add_argument("--missiles", nargs="*", default=[], help="missile names or glob patterns (default: all)")
+    parser.add_argument("--scenario", action="append", default=[], help=f"launch conditions {','.join(SWEEP_AXES)}, can be repeated")
+    parser.add_argument("--scenarios", help="CSV (with header) or JSON file of scenarios")
+    parser.add_argument("--output", help="output file, .csv or .jsonl (default: CSV on stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="output format (default: from the output file extension)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--integrator", choices=["fixed", "adaptive"], default="fixed")
+    parser.add_argument("--stop", nargs="*", choices=["intercept", "closing", "ground"], default=[], help="end each flight early at these events (default: fly until time_life or max_distance)")
+    parser.add_argument("--kill-speed", type=float, default=0.0, help="end each flight when its speed falls below this after burnout (m/s)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    stop = parse_stop_conditions(args.stop, args.kill_speed)
+    scenarios = [parse_scenario(text, number) for number, text in enumerate(args.scenario, 1)]
+    if args.scenarios:
+        scenarios += load_scenarios(args.scenarios)
+    if not scenarios:
+        scenarios = [dict(DEFAULT_SCENARIO)]
+
+    # Loading messages go to stderr so they can't mix with results written to stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        version, blk_files_info = load_catalogue(args.compiled_dir)
+        profiles = select_profiles(build_profiles(blk_files_info), args.missiles)
+    if not profiles:
+        print("No missiles match", file=sys.stderr)
+        return 1
+    print(f"Game version {version}: {len(profiles)} missiles x {len(scenarios)} scenarios", file=sys.stderr)
+
+    output_format = args.format or ("jsonl" if args.output and args.output.endswith(('.jsonl', '.json')) else "csv")
+    file = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        failed = run_batch(profiles, scenarios, RowWriter(file, output_format).write, args.workers, integrator=args.integrator, stop=stop)
+    finally:
+        if args.output:
+            file.close()
+    if failed:
+        print(f"{failed} simulations failed", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
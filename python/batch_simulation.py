@@ -0,0 +1,262 @@
+import numpy as np
+import atmosphere
+import integration_kernel
+from missile_profile import as_profile, build_profiles
+from cancellation import SimulationCancelled
+from stop_conditions import StopConditions
+
+# simulate_batch pays a fixed numpy cost per step whatever the number of missiles: it is faster than
+# one compute_dependent_variables per missile from about this many missiles, and only without Numba
+BATCH_MIN_MISSILES = 32
+# Largest batch, the recorded series of a batch are held in memory until it ends
+BATCH_MAX_MISSILES = 64
+# Steps between checks of cancel_event
+CANCEL_CHECK_STEPS = 256
+
+def use_batch(count, integrator="fixed"):
+    """True when count missiles flown with the same launch conditions are faster in simulate_batch calls."""
+    return integrator == "fixed" and count >= BATCH_MIN_MISSILES and not integration_kernel.use_jit()
+
+def split_batches(items):
+    """items in consecutive batches of at most BATCH_MAX_MISSILES, of about the same size."""
+    count = -(-len(items) // BATCH_MAX_MISSILES)
+    size = -(-len(items) // count) if count else 1
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+def simulate_batch(args_list, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, record=True, stop=None, cancel_event=None):
+    """Simulate every missile in args_list together, one vectorized step at a time.
+
+    The flight model and the stop conditions (StopConditions) are the same as
+    compute_dependent_variables with the fixed-step integrator. A missile is
+    masked out once it passes max_distance, reaches time_life, meets a stop
+    condition or leaves the altitude range of the conversion table; the
+    last one is an error for compute_dependent_variables and is flagged in
+    "left_tables". Setting cancel_event raises SimulationCancelled.
+
+    args_list holds MissileProfile objects (or args dicts).
+    Returns a dict of (M,) summary arrays. With record=True it also holds
+    "series": one tuple per missile, laid out like compute_dependent_variables.
+    """
+    g = 9.81
+    time_interval = 0.01
+    profiles = [as_profile(args) for args in args_list]
+    m = len(profiles)
+    stop = stop or StopConditions()
+    # Without a target there is nothing to intercept or close on
+    has_target = initial_target_distance > 0
+
+    def column(attribute):
+        return np.array([getattr(profile, attribute) for profile in profiles], dtype=float)
+
+    names = [profile.name for profile in profiles]
+    schedules = [profile.schedule(time_interval) for profile in profiles]
+    steps_total = np.array([len(times) for times, true_mass, true_thrust in schedules], dtype=np.intp)
+    n = int(steps_total.max()) if m else 0
+    times = np.arange(n) * time_interval
+
+    area = column("area")
+    cxk = column("cxk")
+    end_speed = column("end_speed")
+    max_distance = np.array([np.inf if profile.max_distance is None else profile.max_distance for profile in profiles], dtype=float)
+    tvc = np.radians(column("tvc"))
+    max_load = column("overload")
+    D = column("dist_cm_stab")
+    wing_area = column("wing_area")
+    timeout = column("timeout")
+    Cl = column("Cl")
+    lofting = np.array([profile.lofting for profile in profiles], dtype=bool)
+    loft_climb_angle = column("loft_climb_angle")
+    loft_dive_angle = column("loft_dive_angle")
+    loft_omega_max = column("loft_omega_rate") * time_interval
+    distance_check = column("lock_distance")
+    loft_accel = column("loft_acceleration")
+
+    # Thrust and mass schedules, (n, M)
+    true_mass = np.zeros((n, m))
+    true_thrust = np.zeros((n, m))
+    for j, (profile_times, profile_mass, profile_thrust) in enumerate(schedules):
+        true_mass[:len(profile_times), j] = profile_mass
+        true_thrust[:len(profile_times), j] = profile_thrust
+
+    # State
+    speeds = np.full(m, atmosphere.tas_to_ias(start_speed, launch_altitude) * (1000 / 3600))
+    tas_speed = np.full(m, start_speed / 3.6)
+    horizontal_speeds = np.full(m, start_speed / 3.6)
+    horizontal_distances = np.zeros(m)
+    vertical_distances = np.full(m, float(launch_altitude))
+    target_distances = np.full(m, initial_target_distance * 1000.0)
+    angle = np.zeros(m)
+    true_acceleration = np.zeros(m)
+    climbing = lofting.copy()
+    diving = np.zeros(m, dtype=bool)
+    active = steps_total > 1
+    left_tables = np.zeros(m, dtype=bool)
+    steps = np.minimum(steps_total, 1)
+    peak_tas = tas_speed.copy()
+    peak_mach = atmosphere.mach_number_array(tas_speed * 3.6, np.clip(vertical_distances, atmosphere.MIN_ALTITUDE, atmosphere.MAX_ALTITUDE))
+    target_speed_ms = target_speed * (1000 / 3600)
+
+    if record:
+        history = {key: np.zeros((n, m)) for key in (
+            "drags", "accelerations", "horizontal_distances", "vertical_distances", "target_distances",
+            "thrust_to_weights", "g_load", "turn_radius", "turn_rates", "tas_speed")}
+        history["tas_speed"][0] = tas_speed
+        history["vertical_distances"][0] = vertical_distances
+        history["target_distances"][0] = target_distances
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in range(1, n):
+            if cancel_event is not None and i % CANCEL_CHECK_STEPS == 0 and cancel_event.is_set():
+                raise SimulationCancelled()
+            # The conversion table stops at its altitude bounds
+            in_tables = (vertical_distances >= atmosphere.MIN_ALTITUDE) & (vertical_distances <= atmosphere.MAX_ALTITUDE)
+            left_tables |= active & ~in_tables
+            active &= in_tables
+            if not active.any():
+                break
+            altitude = np.clip(vertical_distances, atmosphere.MIN_ALTITUDE, atmosphere.MAX_ALTITUDE)
+            rho = atmosphere.rho_array(vertical_distances)
+            ias_ratio = atmosphere.ias_ratio_array(altitude)
+            mass = true_mass[i]
+            thrust = true_thrust[i]
+
+            drags = 0.5 * rho * speeds ** 2 * cxk * area
+            accelerations = (thrust * ias_ratio - drags) / mass
+
+            remaining = target_distances - horizontal_distances
+            desired_altitude_change = target_altitude - vertical_distances
+            if target_speed != 0:
+                intersection_time = remaining / (horizontal_speeds - target_speed_ms)
+                angle1 = np.arctan(desired_altitude_change / (intersection_time * speeds))
+                dive_check = np.arctan(desired_altitude_change / remaining)
+            else:
+                angle1 = np.zeros(m)
+                dive_check = np.zeros(m)
+            desired_loft_angle = np.minimum(np.abs(true_acceleration) * loft_accel * 0.005, loft_climb_angle)
+
+            lock = lofting & (distance_check > 0) & (remaining < distance_check / 2)
+            climbing &= ~lock
+            diving |= lock
+
+            # Altitude functions
+            passed = remaining <= 0
+            climb_to_target = ~passed & (target_altitude > vertical_distances)
+            loft = ~passed & ~climb_to_target & lofting
+            climb = loft & climbing
+            dive = loft & ~climbing & diving
+            level = ~passed & ~climb_to_target & ~lofting
+
+            climb_angle = np.where(desired_loft_angle > angle + loft_omega_max, angle + loft_omega_max,
+                                   np.maximum(desired_loft_angle, angle - loft_omega_max))
+            dive_angle = np.where(angle1 > 0, np.minimum(angle - loft_omega_max, angle1),
+                                  np.where(angle1 < 0, np.maximum(angle - loft_omega_max, angle1), angle1))
+            new_angle = np.zeros(m)
+            new_angle = np.where(climb_to_target, angle1, new_angle)
+            new_angle = np.where(climb, climb_angle, new_angle)
+            new_angle = np.where(dive, dive_angle, new_angle)
+            new_angle = np.where(level & (desired_altitude_change != 0), angle1, new_angle)
+
+            start_dive = climb & (np.abs(dive_check) >= loft_dive_angle)
+            diving |= start_dive
+            climbing &= ~start_dive
+
+            thrust_acceleration_x = accelerations * np.cos(new_angle)
+            thrust_acceleration_y = accelerations * np.sin(new_angle)
+            new_true_acceleration = np.sign(accelerations) * np.sqrt(thrust_acceleration_x ** 2 + thrust_acceleration_y ** 2) - g * np.sin(new_angle)
+
+            new_speeds = speeds + new_true_acceleration * time_interval
+            new_tas = new_speeds / ias_ratio
+            capped = end_speed != 0
+            new_tas = np.where(capped, np.minimum(new_tas, end_speed), new_tas)
+            new_speeds = np.where(capped, new_tas * ias_ratio, new_speeds)
+
+            new_horizontal_speeds = new_tas * np.cos(new_angle)
+            new_horizontal_distances = horizontal_distances + new_horizontal_speeds * time_interval
+            new_vertical_distances = vertical_distances + new_tas * np.sin(new_angle) * time_interval
+
+            turn_rate = ((Cl * wing_area * 0.5 * rho * new_speeds ** 2 * D) / mass + (tvc * D * thrust) / mass) * time_interval
+            radius_check = new_tas / turn_rate
+            load_check = new_tas ** 2 / (radius_check * g)
+            clamp = (max_load != 0) & ~(load_check < max_load)
+            clamped_radius = new_tas ** 2 / (max_load * g)
+            guided = timeout <= times[i]
+            g_load = np.where(guided, np.where(clamp, max_load, load_check), 0.0)
+            turn_radius = np.where(guided, np.where(clamp, clamped_radius, radius_check), 0.0)
+            turn_rates = np.where(guided, np.where(clamp, new_tas / clamped_radius, turn_rate), 0.0)
+
+            # Commit the step for the missiles still flying
+            speeds = np.where(active, new_speeds, speeds)
+            tas_speed = np.where(active, new_tas, tas_speed)
+            horizontal_speeds = np.where(active, new_horizontal_speeds, horizontal_speeds)
+            horizontal_distances = np.where(active, new_horizontal_distances, horizontal_distances)
+            vertical_distances = np.where(active, new_vertical_distances, vertical_distances)
+            target_distances = np.where(active, target_distances + target_speed_ms * time_interval, target_distances)
+            angle = np.where(active, new_angle, angle)
+            true_acceleration = np.where(active, new_true_acceleration, true_acceleration)
+            peak_tas = np.where(active, np.maximum(peak_tas, new_tas), peak_tas)
+            mach = atmosphere.mach_number_array(tas_speed * 3.6, np.clip(vertical_distances, atmosphere.MIN_ALTITUDE, atmosphere.MAX_ALTITUDE))
+            peak_mach = np.where(active, np.maximum(peak_mach, mach), peak_mach)
+            steps[active] = i + 1
+
+            if record:
+                history["tas_speed"][i] = tas_speed
+                history["drags"][i] = drags
+                history["accelerations"][i] = accelerations
+                history["horizontal_distances"][i] = horizontal_distances
+                history["vertical_distances"][i] = vertical_distances
+                history["target_distances"][i] = target_distances
+                history["thrust_to_weights"][i] = thrust / mass
+                history["g_load"][i] = g_load
+                history["turn_radius"][i] = turn_radius
+                history["turn_rates"][i] = turn_rates
+
+            # Mask out missiles past max_distance, at the end of their life or stopped by a stop condition
+            ended = horizontal_distances > max_distance
+            burnt_out = thrust == 0
+            if stop.intercept and has_target:
+                ended |= horizontal_distances >= target_distances
+            if stop.closing and has_target:
+                ended |= burnt_out & (horizontal_speeds <= target_speed_ms) & (horizontal_distances < target_distances)
+            if stop.kill_speed > 0:
+                ended |= burnt_out & (tas_speed < stop.kill_speed)
+            if stop.ground:
+                ended |= vertical_distances <= 0
+            active &= ~ended & (steps < steps_total)
+
+    altitude = np.clip(vertical_distances, atmosphere.MIN_ALTITUDE, atmosphere.MAX_ALTITUDE)
+    result = {
+        "names": names,
+        "steps": steps,
+        "time_of_flight": times[steps - 1] if m else np.zeros(0),
+        "range": horizontal_distances,
+        "final_altitude": vertical_distances,
+        "final_speed": tas_speed,
+        "final_mach": atmosphere.mach_number_array(tas_speed * 3.6, altitude),
+        "peak_speed": peak_tas,
+        "peak_mach": peak_mach,
+        "left_tables": left_tables,
+    }
+
+    if record:
+        series = []
+        for j in range(m):
+            k = steps[j]
+            column_of = {key: values[:k, j].copy() for key, values in history.items()}
+            altitude = np.clip(column_of["vertical_distances"], atmosphere.MIN_ALTITUDE, atmosphere.MAX_ALTITUDE)
+            mach_numbers = atmosphere.mach_number_array(column_of["tas_speed"] * 3.6, altitude)
+            accelerations_tas = atmosphere.ias_to_tas_array(column_of["accelerations"], altitude)
+            series.append((times[:k].copy(), true_mass[:k, j].copy(), true_thrust[:k, j].copy(), column_of["tas_speed"],
+                           mach_numbers, column_of["drags"], accelerations_tas, column_of["horizontal_distances"],
+                           column_of["vertical_distances"], column_of["target_distances"], column_of["thrust_to_weights"],
+                           column_of["g_load"], column_of["turn_radius"], column_of["turn_rates"]))
+        result["series"] = series
+
+    return result
+
+def simulate_catalogue(compiled_info, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, names=None, record=False, stop=None):
+    """Simulate the missiles of a loaded compiled_info.json (all of them, or only names) in one batch."""
+    blk_files_info = compiled_info.get("data", {})
+    if names is not None:
+        blk_files_info = {name: blk_files_info[name] for name in names}
+    profiles = list(build_profiles(blk_files_info).values())
+    return simulate_batch(profiles, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, record=record, stop=stop)
@@ -0,0 +1,253 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import fnmatch
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+import subprocess
+
+# Benchmarks of the simulation, extraction and startup hot paths on a synthetic datamine,
+# no network or clone needed. Run from the python directory:
+#   python benchmark.py                   time everything, compare to benchmark_baseline.json
+#   python benchmark.py --save-baseline   store the results as the new baseline
+#   python benchmark.py --only "sim_*"    run a subset
+#   python benchmark.py --startup-results startup.json
+#                                         also compare the GUI startup phases saved by
+#                                         python Missilegraph.py --profile-startup startup.json
+# The exit code is 1 when a benchmark is slower than the baseline by more than --threshold.
+
+SCRIPT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+ROCKETGUNS = os.path.join('rocketguns_json', 'aces.vromfs.bin_u', 'gamedata', 'weapons', 'rocketguns')
+LANG = os.path.join('rocketguns_json', 'lang.vromfs.bin_u', 'lang')
+CONDITIONS = (1224, 1000, 0, 0, 1000)
+TARGET_CONDITIONS = (1224, 5000, 0, 15, 5000)
+
+def make_rocket(number, rng):
+    """A synthetic aam rocketguns file, in the layout extract_info reads."""
+    caliber = rng.choice([0.127, 0.16, 0.178, 0.2])
+    mass = round(rng.uniform(70, 250), 1)
+    mass_end = round(mass * rng.uniform(0.6, 0.8), 1)
+    rocket = {
+        "bulletType": "aam",
+        "bulletName": f"bench_{number:04d}",
+        "caliber": caliber,
+        "CxK": round(rng.uniform(0.9, 2.0), 2),
+        "mass": mass,
+        "massEnd": mass_end,
+        "timeFire": round(rng.uniform(1.5, 8), 1),
+        "force": round(rng.uniform(8000, 25000)),
+        "timeLife": rng.choice([30, 40, 60, 80]),
+        "endSpeed": 0,
+        "maxDistance": rng.choice([20000, 60000, 100000]),
+        "finsAoaHor": round(rng.uniform(0.1, 0.3), 3),
+        "thrustVectoringAngle": rng.choice([0, 0, 0.2]),
+        "distFromCmToStab": round(rng.uniform(0.2, 0.6), 2),
+        "wingAreaMult": round(rng.uniform(1, 4), 2),
+        "guidance": {"guidanceAutopilot": {"reqAccelMax": rng.choice([20, 30, 40]), "timeOut": 0.5}},
+    }
+    if number % 3 == 0:
+        rocket.update(massEnd1=round(mass_end * 0.85, 1), timeFire1=round(rng.uniform(3, 10), 1), force1=round(rng.uniform(2000, 6000)))
+    if number % 4 == 0:
+        rocket["guidance"]["guidanceAutopilot"].update(loftElevation=20, loftTargetElevation=-10, loftTargetOmegaMax=1.5, loftAngleToAccelMult=2)
+        rocket["guidance"]["radarSeeker"] = {"receiver": {"range": 20000}}
+    return {"rocket": rocket}
+
+def make_fixture(root, count=300, seed=0):
+    """Synthetic rocketguns_json in root: count missiles, their version file and localisation tables."""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(root, ROCKETGUNS))
+    os.makedirs(os.path.join(root, LANG))
+    with open(os.path.join(root, 'rocketguns_json', 'aces.vromfs.bin_u', 'version'), 'w') as file:
+        file.write('2.0.0.0')
+
+    weaponry = ['<ID|readonly|noverify>;<English>;<French>']
+    for number in range(count):
+        with open(os.path.join(root, ROCKETGUNS, f'bench_{number:04d}.blkx'), 'w') as file:
+            json.dump(make_rocket(number, rng), file, indent=2)
+        weaponry.append(f'weapons/bench_{number:04d}/short;"BENCH-{number}";"BENCH-{number}"')
+        weaponry.append(f'weapons/bench_{number:04d};"Bench missile {number}";"Missile {number}"')
+    tables = {
+        'units_weaponry.csv': weaponry,
+        'units.csv': ['<ID|readonly|noverify>;<English>'] + [f'unit_{number}_shop;"Unit {number}"' for number in range(count)],
+        'units_modifications.csv': ['<ID|readonly|noverify>;<English>'] + [f'sensors/sensor_{number};"Sensor {number}"' for number in range(count)],
+    }
+    for filename, lines in tables.items():
+        with open(os.path.join(root, LANG, filename), 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+
+def bench_profile(time_life):
+    from missile_profile import MissileProfile
+    return MissileProfile.from_compiled_info(f"bench_{time_life}", {
+        "caliber": 0.178, "cxk": 1.2, "mass": 161.0, "mass_end_booster": 120.0, "mass_end_sustainer": 105.0,
+        "time_fire_booster": 3.0, "time_fire_sustainer": 6.0, "force_booster": 20000.0, "force_sustainer": 5000.0,
+        "time_life": time_life, "end_speed": 0, "max_distance": 200000.0, "loft_elevation": 20.0, "loft_target_elevation": 10.0,
+        "loft_omega_max": 1.5, "loft_angle_acceleration": 2.0, "lock_distance": 20000.0, "aoa": 25.0, "overload": 30.0,
+        "dist_cm_stab": 0.5, "wing_area": 0.2, "guidance_timeout": 0.5,
+    })
+
+def benchmarks():
+    """(name, setup, function) of every benchmark. setup() runs before each timed call of function()."""
+    from graph_maker_missile import compute_dependent_variables, simulate_missiles
+    import JSON_dump
+    import find_name
+    from catalogue import load_catalogue
+    from stop_conditions import UNTIL_OUTCOME
+
+    def nothing():
+        pass
+
+    def simulate(time_life, integrator, conditions=CONDITIONS, stop=None):
+        profile = bench_profile(time_life)
+        return lambda: compute_dependent_variables(profile, *conditions, integrator=integrator, stop=stop)
+
+    def compare():
+        simulate_missiles([bench_profile(40), bench_profile(80)], *CONDITIONS)
+
+    def clear_dump():
+        shutil.rmtree(JSON_dump.compiled_dir, ignore_errors=True)
+        shutil.rmtree('saves_compiled_info', ignore_errors=True)
+        find_name._indexes.clear()
+
+    def ensure_dump():
+        if not os.path.exists(os.path.join(JSON_dump.compiled_dir, 'compiled_info.json')):
+            JSON_dump.dump()
+
+    def clear_lang_index():
+        shutil.rmtree(find_name.index_directory, ignore_errors=True)
+        find_name._indexes.clear()
+
+    names = [f'bench_{number:04d}' for number in range(300)]
+
+    def lookup_names():
+        for name in names:
+            find_name.find_weapon_name(name)
+
+    def load_json():
+        with open(os.path.join(JSON_dump.compiled_dir, 'compiled_info.json'), 'r') as file:
+            json.load(file)
+
+    def load_and_read_catalogue():
+        version, data = load_catalogue(JSON_dump.compiled_dir)
+        for name in data:
+            data[name]
+
+    def startup():
+        # Imports of the GUI script (its window is only built when run as __main__)
+        environment = dict(os.environ, PYTHONPATH=SCRIPT_DIRECTORY)
+        subprocess.run([sys.executable, '-c', 'import Missilegraph'], check=True, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    result = []
+    for time_life in (20, 40, 80):
+        result.append((f"sim_fixed_time_life_{time_life}", nothing, simulate(time_life, "fixed")))
+    for time_life in (40, 80):
+        result.append((f"sim_adaptive_time_life_{time_life}", nothing, simulate(time_life, "adaptive")))
+    # Same flight against a 15 km target, flown in full and only up to the intercept
+    result.append(("sim_target_full", nothing, simulate(80, "fixed", TARGET_CONDITIONS)))
+    result.append(("sim_target_until_outcome", nothing, simulate(80, "fixed", TARGET_CONDITIONS, UNTIL_OUTCOME)))
+    result += [
+        ("sim_comparison", nothing, compare),
+        ("dump_full", clear_dump, lambda: JSON_dump.dump()),
+        ("dump_full_serial", clear_dump, lambda: JSON_dump.dump(max_workers=1)),
+        ("dump_unchanged", nothing, lambda: JSON_dump.dump()),
+        ("find_name_cold", clear_lang_index, lookup_names),
+        ("find_name_warm", nothing, lookup_names),
+        ("load_compiled_info_json", ensure_dump, load_json),
+        ("load_catalogue", ensure_dump, load_and_read_catalogue),
+        ("startup_imports", nothing, startup),
+    ]
+    return result
+
+def run(patterns, repeat):
+    """Time the benchmarks matching patterns, each repeat times, inside a fresh synthetic datamine."""
+    results = {}
+    working_directory = os.getcwd()
+    root = tempfile.mkdtemp(prefix='missilegraph-benchmark-')
+    try:
+        make_fixture(root)
+        os.chdir(root)
+        for name, setup, function in benchmarks():
+            if patterns and not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+                continue
+            times = []
+            try:
+                for _ in range(repeat):
+                    # The dump and lookups print progress, only the timings are shown
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        setup()
+                        start = time.perf_counter()
+                        function()
+                        times.append(time.perf_counter() - start)
+            except Exception as e:
+                print(f"{name:<28} failed: {e}")
+                continue
+            results[name] = {"median": statistics.median(times), "min": min(times), "repeat": repeat}
+            print(f"{name:<28} {results[name]['median'] * 1000:10.1f} ms (min {results[name]['min'] * 1000:.1f} ms)")
+    finally:
+        os.chdir(working_directory)
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+def compare_to_baseline(results, baseline, threshold):
+    """Names of the benchmarks whose median is more than threshold (0.1 = 10 %) slower than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["median"] / baseline[name]["median"]
+        status = "REGRESSION" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else "same"
+        print(f"{name:<28} {ratio:6.2f}x baseline  {status}")
+        if status == "REGRESSION":
+            regressions.append(name)
+    return regressions
+
+def save_results(file_path, results):
+    with open(file_path, 'w') as file:
+        json.dump({"python": platform.python_version(), "platform": platform.platform(), "results": results}, file, indent=4)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation, extraction and startup hot paths")
+    parser.add_argument("--only", nargs="*", default=[], help="glob patterns of the benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default="benchmark_baseline.json")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a regression is reported (0.2 = 20 %%)")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the baseline")
+    parser.add_argument("--startup-results", help="startup phase timings saved by Missilegraph.py --profile-startup FILE, added to the results")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, SCRIPT_DIRECTORY)
+    results = run(args.only, args.repeat)
+    if args.startup_results:
+        with open(args.startup_results, 'r') as file:
+            startup_results = json.load(file)["results"]
+        for name, result in startup_results.items():
+            print(f"{name:<28} {result['median'] * 1000:10.1f} ms (from {args.startup_results})")
+        results.update(startup_results)
+    save_results(args.output, results)
+    print(f"Saved results to {args.output}")
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)["results"]
+    except FileNotFoundError:
+        print(f"No baseline {args.baseline}, run with --save-baseline to create one")
+        return 0
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmarks slower than the baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
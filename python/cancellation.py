@@ -0,0 +1,4 @@
+# Shared by the simulations and the background job runner, imports nothing so any module can use it
+
+class SimulationCancelled(Exception):
+    """Raised inside a simulation when its cancel_event is set."""
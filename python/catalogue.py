@@ -0,0 +1,152 @@
+import os
+import json
+import shutil
+from collections.abc import Mapping
+import numpy as np
+
+# Bump when the on-disk layout changes so old catalogues are rebuilt
+CATALOGUE_FORMAT = 1
+
+class Catalogue(Mapping):
+    """compiled_info["data"] stored as one memory-mapped .npy column per field.
+
+    Works like the {missile name: record dict} mapping loaded from
+    compiled_info.json, but records are only rebuilt as dicts when accessed.
+    column() gives the whole field across all missiles for vectorized queries.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'meta.json'), 'r') as file:
+            meta = json.load(file)
+        self.directory = directory
+        self.meta = meta
+        self.version = meta["version"]
+        self.fields = [field["name"] for field in meta["fields"]]
+        self.kinds = {field["name"]: field["kind"] for field in meta["fields"]}
+        self.names = np.load(os.path.join(directory, 'names.npy'), mmap_mode='r')
+        self.present = np.load(os.path.join(directory, 'present.npy'), mmap_mode='r')
+        self.nulls = np.load(os.path.join(directory, 'nulls.npy'), mmap_mode='r')
+        self.columns = {field: np.load(os.path.join(directory, f'column_{number}.npy'), mmap_mode='r') for number, field in enumerate(self.fields)}
+        self._rows = None
+
+    def _row(self, name):
+        if self._rows is None:
+            self._rows = {str(name): row for row, name in enumerate(self.names)}
+        return self._rows[name]
+
+    def column(self, field):
+        """Values of field for every missile, in the order of names. Check present and nulls for missing values."""
+        return self.columns[field]
+
+    def __getitem__(self, name):
+        row = self._row(name)
+        record = {}
+        for number, field in enumerate(self.fields):
+            if self.nulls[row, number]:
+                record[field] = None
+            elif self.present[row, number]:
+                value = self.columns[field][row]
+                kind = self.kinds[field]
+                record[field] = int(value) if kind == "int" else float(value) if kind == "float" else str(value)
+        return record
+
+    def __contains__(self, name):
+        try:
+            self._row(name)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        return (str(name) for name in self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+def _column_kind(values):
+    values = [value for value in values if value is not None]
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        return "int"
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return "float"
+    return "str"
+
+def save_catalogue(directory, version, blk_files_info, source_file=None):
+    """Write blk_files_info as a Catalogue in directory. source_file is the JSON it was exported to."""
+    fields = []
+    for record in blk_files_info.values():
+        for field in record:
+            if field not in fields:
+                fields.append(field)
+
+    names = list(blk_files_info)
+    records = [blk_files_info[name] for name in names]
+    present = np.array([[field in record for field in fields] for record in records], dtype=bool).reshape(len(records), len(fields))
+    nulls = np.array([[field in record and record[field] is None for field in fields] for record in records], dtype=bool).reshape(len(records), len(fields))
+
+    temporary_directory = directory + '.tmp'
+    shutil.rmtree(temporary_directory, ignore_errors=True)
+    os.makedirs(temporary_directory)
+
+    meta_fields = []
+    for number, field in enumerate(fields):
+        values = [record.get(field) for record in records]
+        kind = _column_kind(values)
+        if kind == "int":
+            column = np.array([value if value is not None else 0 for value in values], dtype=np.int64)
+        elif kind == "float":
+            column = np.array([value if value is not None else np.nan for value in values], dtype=np.float64)
+        else:
+            column = np.array([str(value) if value is not None else '' for value in values], dtype=str)
+        np.save(os.path.join(temporary_directory, f'column_{number}.npy'), column)
+        meta_fields.append({"name": field, "kind": kind})
+
+    np.save(os.path.join(temporary_directory, 'names.npy'), np.array(names, dtype=str))
+    np.save(os.path.join(temporary_directory, 'present.npy'), present)
+    np.save(os.path.join(temporary_directory, 'nulls.npy'), nulls)
+
+    meta = {"format": CATALOGUE_FORMAT, "version": version, "fields": meta_fields}
+    if source_file is not None:
+        stat = os.stat(source_file)
+        meta["source_mtime"] = stat.st_mtime
+        meta["source_size"] = stat.st_size
+    with open(os.path.join(temporary_directory, 'meta.json'), 'w') as file:
+        json.dump(meta, file, indent=4)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temporary_directory, directory)
+    return Catalogue(directory)
+
+def load_catalogue(compiled_dir):
+    """Catalogue of compiled_dir, rebuilt from compiled_info.json when that file is newer (e.g. after a version merge).
+
+    Returns (version, data), data is a plain dict if the catalogue can't be written.
+    """
+    compiled_file = os.path.join(compiled_dir, 'compiled_info.json')
+    directory = os.path.join(compiled_dir, 'catalogue')
+    try:
+        catalogue = Catalogue(directory)
+        stat = os.stat(compiled_file)
+        if catalogue.meta.get("format") == CATALOGUE_FORMAT and catalogue.meta.get("source_mtime") == stat.st_mtime and catalogue.meta.get("source_size") == stat.st_size:
+            return catalogue.version, catalogue
+        # Release the memory maps before the files are replaced
+        del catalogue
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error reading catalogue {directory}: {e}")
+
+    try:
+        with open(compiled_file, 'r') as file:
+            compiled_info = json.load(file)
+    except Exception as e:
+        print(f"Error reading compiled info file {compiled_file}: {e}")
+        return "unknown_version", {}
+
+    version = compiled_info.get("version", "unknown_version")
+    data = compiled_info.get("data", {})
+    try:
+        return version, save_catalogue(directory, version, data, compiled_file)
+    except Exception as e:
+        print(f"Error writing catalogue {directory}: {e}")
+        return version, data
@@ -0,0 +1,35 @@
+import numpy as np
+
+def minmax_decimate(x, y, buckets, x_min=None, x_max=None):
+    """Downsample a series (x sorted) for plotting, keeping the min and max point of each bucket.
+
+    Only the points between x_min and x_max (plus one neighbour on each side,
+    so the line reaches the edge of the view) are considered. The result has
+    at most about 2 * buckets points and keeps the first, last and every
+    local extreme a pixel column would show, so the plotted shape is the same
+    as the full series at that width.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    start = 0 if x_min is None else max(int(np.searchsorted(x, x_min)) - 1, 0)
+    end = len(x) if x_max is None else min(int(np.searchsorted(x, x_max, side='right')) + 1, len(x))
+    x = x[start:end]
+    y = y[start:end]
+
+    buckets = max(int(buckets), 1)
+    if len(x) <= 4 * buckets:
+        return x, y
+
+    size = int(np.ceil(len(x) / buckets))
+    count = len(x) // size * size
+    blocks = y[:count].reshape(-1, size)
+    offsets = np.arange(len(blocks)) * size
+    keep = np.concatenate((
+        [0],
+        offsets + np.argmin(blocks, axis=1),
+        offsets + np.argmax(blocks, axis=1),
+        np.arange(count, len(x)),
+        [len(x) - 1],
+    ))
+    keep = np.unique(keep)
+    return x[keep], y[keep]
@@ -0,0 +1,143 @@
+import os
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from graph_maker_missile import compute_dependent_variables
+from batch_simulation import simulate_batch, use_batch, split_batches
+from cancellation import SimulationCancelled
+from stop_conditions import UNTIL_OUTCOME
+
+# Launch condition axes of a sweep, in the order of compute_dependent_variables' arguments
+SWEEP_AXES = ["start_speed", "launch_altitude", "target_speed", "initial_target_distance", "target_altitude"]
+
+def parse_sweep_values(text, default):
+    """Parse an entry box value: "1000", "800, 1000, 1200" or "start:stop:count"."""
+    text = text.strip()
+    if not text:
+        return np.array([float(default)])
+    if ':' in text:
+        start, stop, count = text.split(':')
+        return np.linspace(float(start), float(stop), int(count))
+    return np.array([float(value) for value in text.replace(',', ' ').split()])
+
+def simulate_cell(args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator="fixed", stop=UNTIL_OUTCOME, cancel_event=None):
+    """Range (m) and time to target (s, NaN if never reached) for one launch condition."""
+    try:
+        results = compute_dependent_variables(args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator, cancel_event, stop)
+    except ValueError as e:
+        print(f"Sweep cell {args['name']} {start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude} failed: {e}")
+        return np.nan, np.nan
+    return cell_outcome(results, initial_target_distance)
+
+def cell_outcome(results, initial_target_distance):
+    """Range (m) and time to target (s, NaN if never reached) of one flight's results."""
+    times = results[0]
+    horizontal_distances = results[7]
+    target_distances = results[9]
+    # Without a target (initial distance 0) there is nothing to reach
+    reached = np.flatnonzero(horizontal_distances >= target_distances) if initial_target_distance > 0 else []
+    time_to_target = times[reached[0]] if len(reached) else np.nan
+    return horizontal_distances[-1], time_to_target
+
+# Seconds between checks of the sweep's cancel_event while chunks run
+CANCEL_POLL_INTERVAL = 0.1
+
+# Set in each worker process by _init_worker, stops the running chunk when the sweep is cancelled
+_worker_cancel_event = None
+
+def _init_worker(cancel_event):
+    global _worker_cancel_event
+    _worker_cancel_event = cancel_event
+
+def _simulate_chunk(args, cells, integrator, stop):
+    results = []
+    for cell in cells:
+        results.append(simulate_cell(args, *cell, integrator=integrator, stop=stop, cancel_event=_worker_cancel_event))
+    return results
+
+def _simulate_batch_chunk(args_list, cells, stop):
+    # The missiles of args_list flown together, one simulate_batch per cell
+    results = np.full((len(args_list), len(cells), 2), np.nan)
+    for c, cell in enumerate(cells):
+        batch = simulate_batch(args_list, *cell, stop=stop, cancel_event=_worker_cancel_event)
+        for m, (args, left_tables, series) in enumerate(zip(args_list, batch["left_tables"], batch["series"])):
+            if left_tables:
+                print(f"Sweep cell {args['name']} {cell} failed: Altitude out of bounds for interpolation")
+                continue
+            results[m, c] = cell_outcome(series, cell[3])
+    return results
+
+def sweep_envelope(args_list, start_speeds, launch_altitudes, target_speeds, initial_target_distances, target_altitudes, max_workers=None, chunk_size=16, progress=None, integrator="fixed", cancel_event=None, stop=UNTIL_OUTCOME):
+    """Simulate every missile in args_list over the full grid of launch conditions.
+
+    Grid cells are spread over a ProcessPoolExecutor in chunks of chunk_size.
+    Without the Numba kernel, many missiles are flown together per cell by
+    simulate_batch.
+    progress(done, total) is called in the calling process as cells complete.
+    Setting cancel_event raises SimulationCancelled within CANCEL_POLL_INTERVAL:
+    queued chunks are dropped and the running ones stop at their next step
+    chunk, without waiting for them.
+    Each flight ends at the first of the stop conditions: by default the
+    intercept, or once the target can't be caught any more, so "range" is
+    the distance flown until the outcome when a target distance is set.
+
+    Returns a dict with "range" and "time_to_target" arrays of shape
+    (len(args_list), len(start_speeds), len(launch_altitudes), len(target_speeds),
+    len(initial_target_distances), len(target_altitudes)) and the axis values.
+    """
+    axes = [np.atleast_1d(np.asarray(values, dtype=float)) for values in
+            (start_speeds, launch_altitudes, target_speeds, initial_target_distances, target_altitudes)]
+    grid_shape = tuple(len(values) for values in axes)
+    cells = [tuple(float(axes[k][index[k]]) for k in range(len(axes))) for index in np.ndindex(grid_shape)]
+    shape = (len(args_list),) + grid_shape
+
+    ranges = np.full((len(args_list), len(cells)), np.nan)
+    times_to_target = np.full((len(args_list), len(cells)), np.nan)
+    total = ranges.size
+    done = 0
+
+    worker_cancel_event = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), initializer=_init_worker, initargs=(worker_cancel_event,))
+    finished = False
+    try:
+        futures = {}
+        if use_batch(len(args_list), integrator):
+            for missiles in split_batches(list(range(len(args_list)))):
+                for start in range(0, len(cells), chunk_size):
+                    future = executor.submit(_simulate_batch_chunk, [args_list[m] for m in missiles], cells[start:start + chunk_size], stop)
+                    futures[future] = (missiles, start)
+        else:
+            for m, args in enumerate(args_list):
+                for start in range(0, len(cells), chunk_size):
+                    future = executor.submit(_simulate_chunk, args, cells[start:start + chunk_size], integrator, stop)
+                    futures[future] = ([m], start)
+
+        pending = set(futures)
+        while pending:
+            completed, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if cancel_event is not None and cancel_event.is_set():
+                worker_cancel_event.set()
+                raise SimulationCancelled()
+            for future in completed:
+                missiles, start = futures[future]
+                # (missiles, cells, 2) for both kinds of chunk
+                outcomes = np.asarray(future.result(), dtype=float).reshape(len(missiles), -1, 2)
+                end = start + outcomes.shape[1]
+                ranges[missiles, start:end] = outcomes[:, :, 0]
+                times_to_target[missiles, start:end] = outcomes[:, :, 1]
+                done += outcomes.shape[0] * outcomes.shape[1]
+            if completed and progress:
+                progress(done, total)
+        finished = True
+    finally:
+        # A cancelled or failed sweep doesn't wait for the workers
+        executor.shutdown(wait=finished, cancel_futures=not finished)
+
+    result = {
+        "range": ranges.reshape(shape),
+        "time_to_target": times_to_target.reshape(shape),
+        "names": [args["name"] for args in args_list],
+        "axes": SWEEP_AXES,
+    }
+    result.update(zip(SWEEP_AXES, axes))
+    return result
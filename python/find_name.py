@@ -1,45 +1,82 @@
-import pandas as pd
+import os
 import json
 
-# Load the CSV file into a DataFrame
-csv_file_path_modif = r'rocketguns_json\lang\lang.vromfs.bin_u\lang\units_modifications.csv'
-df = pd.read_csv(csv_file_path_modif, on_bad_lines='skip', delimiter=';')
+# Localisation tables of the datamine, loaded on first use. Older installs
+# have the lang folder in a separate clone nested in rocketguns_json.
+lang_directories = [
+    os.path.join('rocketguns_json', 'lang.vromfs.bin_u', 'lang'),
+    os.path.join('rocketguns_json', 'lang', 'lang.vromfs.bin_u', 'lang'),
+]
+index_directory = 'compiled_lang_index'
 
-csv_file_path = r'rocketguns_json\lang\lang.vromfs.bin_u\lang\units.csv'
-du = pd.read_csv(csv_file_path, on_bad_lines='skip', delimiter=';')
+tables = {
+    "modifications": "units_modifications.csv",
+    "units": "units.csv",
+    "weaponry": "units_weaponry.csv",
+}
 
-file_path_weaponry = r'rocketguns_json\lang\lang.vromfs.bin_u\lang\units_weaponry.csv'
-dw = pd.read_csv(file_path_weaponry, on_bad_lines='skip', delimiter=';')
+_indexes = {}
+
+def build_index(csv_file_path):
+    """key -> string in the first language, from the first two columns of a localisation CSV."""
+    import pandas as pd
+    df = pd.read_csv(csv_file_path, on_bad_lines='skip', delimiter=';', usecols=[0, 1])
+    index = {}
+    for key, value in zip(df.iloc[:, 0], df.iloc[:, 1]):
+        # The first row of a key wins, empty cells are kept as None
+        if isinstance(key, str) and key not in index:
+            index[key] = None if pd.isna(value) else str(value)
+    return index
+
+def get_index(table):
+    """Index of one localisation table, cached on disk until the CSV changes."""
+    if table in _indexes:
+        return _indexes[table]
+
+    csv_file_path = os.path.join(lang_directories[0], tables[table])
+    for directory in lang_directories:
+        if os.path.exists(os.path.join(directory, tables[table])):
+            csv_file_path = os.path.join(directory, tables[table])
+            break
+    index_file_path = os.path.join(index_directory, f'{table}.json')
+    try:
+        stat = os.stat(csv_file_path)
+    except OSError as e:
+        print(f"Error reading localisation file {csv_file_path}: {e}")
+        _indexes[table] = {}
+        return _indexes[table]
+
+    try:
+        with open(index_file_path, 'r') as file:
+            cached = json.load(file)
+        if cached["mtime"] == stat.st_mtime and cached["size"] == stat.st_size:
+            _indexes[table] = cached["index"]
+            return _indexes[table]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = build_index(csv_file_path)
+    try:
+        os.makedirs(index_directory, exist_ok=True)
+        with open(index_file_path + '.tmp', 'w') as file:
+            json.dump({"mtime": stat.st_mtime, "size": stat.st_size, "index": index}, file)
+        os.replace(index_file_path + '.tmp', index_file_path)
+    except OSError as e:
+        print(f"Error saving localisation index {index_file_path}: {e}")
+    _indexes[table] = index
+    return index
 
-# Update the DataFrame with the JSON values where the name matches
 def find_sensor_name(file_name):
-    key = 'sensors/'+file_name
-    if key in df.iloc[:, 0].values:
-        row_index = df.index[df.iloc[:, 0] == key].tolist()[0]
-        string_in_first_language = df.iloc[row_index, 1]
-        return(string_in_first_language. encode('ascii', 'ignore').decode('ascii'))
-    else: 
-        return None
+    name = get_index("modifications").get('sensors/' + file_name)
+    return name.encode('ascii', 'ignore').decode('ascii') if name is not None else None
 
 def find_unit_name(file_name):
-    key = file_name + '_shop'
-    if key in du.iloc[:, 0].values:
-        row_index = du.index[du.iloc[:, 0] == key].tolist()[0]
-        string_in_first_language = du.iloc[row_index, 1]
-        return(string_in_first_language. encode('ascii', 'ignore').decode('ascii') if not isinstance(string_in_first_language, float) else file_name)
-    else: 
-        return file_name
+    name = get_index("units").get(file_name + '_shop')
+    return name.encode('ascii', 'ignore').decode('ascii') if name is not None else file_name
 
 def find_weapon_name(file_name):
-    key = 'weapons/' + file_name + '/short'
-    if key in dw.iloc[:, 0].values:
-        row_index = dw.index[dw.iloc[:, 0] == key].tolist()[0]
-        string_in_first_language = dw.iloc[row_index, 1]
-        return(string_in_first_language. encode('ascii', 'ignore').decode('ascii'))
-    else: 
-        return file_name
-
-# Save the updated DataFrame back to a new CSV file
+    name = get_index("weaponry").get('weapons/' + file_name + '/short')
+    return name.encode('ascii', 'ignore').decode('ascii') if name is not None else file_name
 
 if __name__ == "__main__":
     print(find_weapon_name('cn_pl12'))
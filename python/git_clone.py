@@ -21,7 +21,17 @@ def remove_readonly(func, path, _):
     os.chmod(path, stat.S_IWRITE)
     func(path)
 
-def clone_specific_folder(repo_url, folder_path, local_dir, branch="main"):
+def run_git(args, local_dir):
+    """Run a git command inside local_dir. Returns the return code and stdout."""
+    result = subprocess.run(["git", "-C", local_dir] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        print(result.stderr.strip())
+    return result.returncode, result.stdout
+
+def clone_specific_folder(repo_url, folder_paths, local_dir, branch="main"):
+    if isinstance(folder_paths, str):
+        folder_paths = [folder_paths]
+
     # Step 1: Remove the existing local directory if it exists
     if os.path.exists(local_dir):
         print(f"Removing existing directory: {local_dir}")
@@ -34,31 +44,58 @@ def clone_specific_folder(repo_url, folder_path, local_dir, branch="main"):
         print("Failed to clone repository.")
         sys.exit(1)
     
-    # Change the current directory to the local directory
-    os.chdir(local_dir)
-    
     # Step 3: Initialize sparse-checkout
     print("Initializing sparse-checkout")
-    result = run_command(["git", "sparse-checkout", "init", "--cone"])
+    result = run_command(["git", "-C", local_dir, "sparse-checkout", "init", "--cone"])
     if result != 0:
         print("Failed to initialize sparse-checkout.")
         sys.exit(1)
     
-    # Step 4: Set the sparse-checkout folder path
-    print(f"Setting sparse-checkout to folder: {folder_path}")
-    result = run_command(["git", "sparse-checkout", "set", folder_path])
+    # Step 4: Set the sparse-checkout folder paths
+    print(f"Setting sparse-checkout to folders: {', '.join(folder_paths)}")
+    result = run_command(["git", "-C", local_dir, "sparse-checkout", "set"] + folder_paths)
     if result != 0:
         print("Failed to set sparse-checkout folder.")
         sys.exit(1)
     
     # Step 5: Checkout the specified branch
     print(f"Checking out the {branch} branch")
-    result = run_command(["git", "checkout", branch])
+    result = run_command(["git", "-C", local_dir, "checkout", branch])
     if result != 0:
         print(f"Failed to checkout {branch} branch.")
         sys.exit(1)
     
-    print("Successfully cloned the specified folder.")
+    print("Successfully cloned the specified folders.")
+
+def update_specific_folders(folder_paths, local_dir):
+    """Fetch and fast-forward an existing sparse clone, making sure folder_paths are checked out.
+
+    Returns the (status, path) of every file that changed in folder_paths,
+    or None if local_dir can't be updated in place.
+    """
+    if not os.path.isdir(os.path.join(local_dir, '.git')):
+        return None
+
+    result, old_head = run_git(["rev-parse", "HEAD"], local_dir)
+    if result != 0:
+        return None
+    result, branch = run_git(["rev-parse", "--abbrev-ref", "HEAD"], local_dir)
+    if result != 0:
+        return None
+    old_head = old_head.strip()
+    branch = branch.strip()
+
+    for step in (["sparse-checkout", "set"] + folder_paths, ["fetch", "origin", branch], ["merge", "--ff-only", "FETCH_HEAD"]):
+        print(f"git {' '.join(step)}")
+        result, output = run_git(step, local_dir)
+        if result != 0:
+            print(f"Failed to run git {step[0]} in {local_dir}.")
+            return None
+
+    result, diff = run_git(["diff", "--name-status", "--no-renames", old_head, "HEAD", "--"] + folder_paths, local_dir)
+    if result != 0:
+        return None
+    return [tuple(line.split('\t', 1)) for line in diff.splitlines() if line]
 
 def detect_default_branch(repo_url):
     """Detect the default branch of the repository."""
@@ -72,30 +109,34 @@ def detect_default_branch(repo_url):
             return line.split()[1].split("/")[-1]
     return "main"
 
-def clone_repo():
-    # Variables
-    REPO_URL = "https://github.com/gszabi99/War-Thunder-Datamine"  # Replace with your repository URL
-    FOLDER_PATH = "aces.vromfs.bin_u/gamedata/weapons/rocketguns"  # Replace with the path to the specific folder
-    LOCAL_DIR = "rocketguns_json"  # Replace with the desired local directory name
-    
-    # Detect the default branch
-    default_branch = detect_default_branch(REPO_URL)
-    print(f"Default branch detected: {default_branch}")
-    
-    # Clone the specific folder
-    clone_specific_folder(REPO_URL, FOLDER_PATH, LOCAL_DIR, branch=default_branch)
+REPO_URL = "https://github.com/gszabi99/War-Thunder-Datamine"
+LOCAL_DIR = "rocketguns_json"
+# The missiles and their localisation, checked out side by side in one sparse clone
+FOLDER_PATHS = ["aces.vromfs.bin_u/gamedata/weapons/rocketguns", "lang.vromfs.bin_u/lang"]
 
-    REPO_URL = "https://github.com/gszabi99/War-Thunder-Datamine"  # Replace with your repository URL
-    FOLDER_PATH = "lang.vromfs.bin_u/lang/units_weaponry.csv"  # Replace with the path to the specific folder
-    LOCAL_DIR = "lang"  # Replace with the desired local directory name
-    
+def clone_repo(repo_url=REPO_URL, local_dir=LOCAL_DIR, folder_paths=FOLDER_PATHS):
     # Detect the default branch
-    default_branch = detect_default_branch(REPO_URL)
+    default_branch = detect_default_branch(repo_url)
     print(f"Default branch detected: {default_branch}")
     
-    # Clone the specific folder
-    clone_specific_folder(REPO_URL, FOLDER_PATH, LOCAL_DIR, branch=default_branch)
-    
+    # Clone the specific folders
+    clone_specific_folder(repo_url, folder_paths, local_dir, branch=default_branch)
+
+def update_repo(repo_url=REPO_URL, local_dir=LOCAL_DIR, folder_paths=FOLDER_PATHS):
+    """Update the datamine in place, re-cloning only if that fails.
+
+    Returns the changed paths (relative to local_dir), or None after a full clone.
+    """
+    changes = update_specific_folders(folder_paths, local_dir)
+    if changes is None:
+        print("Could not update the existing clone, cloning again")
+        clone_repo(repo_url, local_dir, folder_paths)
+        return None
 
-clone_repo()
+    for status, path in changes:
+        print(f"{status} {path}")
+    print(f"{len(changes)} files changed")
+    return [path for status, path in changes]
 
+if __name__ == "__main__":
+    update_repo()
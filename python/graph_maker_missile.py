@@ -1,68 +1,18 @@
-import argparse
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.widgets import Slider, Button
-import tkinter
 import math
-from scipy.interpolate import interp1d
-
-# Conversion table
-conversion_table = {
-    0: [1224, 1224, 1],
-    1000: [1224, 1167, 1.01],
-    2000: [1224, 1110, 1.02],
-    3000: [1224, 1060, 1.04],
-    4000: [1224, 1000, 1.05],
-    5000: [1224, 950, 1.06],
-    6000: [1224, 900, 1.07],
-    7000: [1224, 850, 1.09],
-    8000: [1224, 800, 1.1],
-    9000: [1224, 750, 1.12],
-    10000: [1224, 700, 1.13],
-    11000: [1224, 670, 1.14],
-    12000: [1224, 625, 1.16],
-    13000: [1224, 580, 1.17],
-    14000: [1224, 544, 1.17],
-    15000: [1224, 500, 1.18],
-    16000: [1224, 465, 1.18],
-    17000: [1224, 425, 1.17],
-    18000: [1224, 390, 1.15],
-    19000: [1224, 370, 1.15],
-    20000: [1224, 360, 1.15],
-}
-
-altitudes = list(conversion_table.keys())
-tas_values = [conversion_table[alt][0] for alt in altitudes]
-ias_values = [conversion_table[alt][1] for alt in altitudes]
-mach_values = [conversion_table[alt][2] for alt in altitudes]
-speed_of_sound_values = [1224 / mach for mach in mach_values]
-
-# Interpolation functions
-tas_to_ias_interp = interp1d(altitudes, ias_values)
-ias_to_tas_interp = interp1d(altitudes, tas_values)
-speed_of_sound_interp = interp1d(altitudes, speed_of_sound_values)
-
-def tas_to_ias(tas, altitude):
-    if altitude < altitudes[0] or altitude > altitudes[-1]:
-        raise ValueError("Altitude out of bounds for interpolation")
-    ias_at_altitude = tas_to_ias_interp(altitude)
-    return tas * (ias_at_altitude / 1224)
-
-def ias_to_tas(ias, altitude):
-    if altitude < altitudes[0] or altitude > altitudes[-1]:
-        raise ValueError("Altitude out of bounds for interpolation")
-    tas_at_altitude = tas_to_ias_interp(altitude)
-    return ias * (1224 / tas_at_altitude)
-
-def get_mach_number(tas, altitude):
-    if altitude < altitudes[0] or altitude > altitudes[-1]:
-        raise ValueError("Altitude out of bounds for interpolation")
-    speed_of_sound = speed_of_sound_interp(altitude)
-    return tas / speed_of_sound
-
+from atmosphere import conversion_table, tas_to_ias, ias_to_tas, get_mach_number, mach_number_array, ias_to_tas_array
+import atmosphere
+from adaptive_integrator import integrate_adaptive
+from missile_profile import as_profile
+from decimation import minmax_decimate
+import instrumentation
+import integration_kernel
+from stop_conditions import StopConditions
+from cancellation import SimulationCancelled
 
 # Function to parse command-line arguments
 def parse_arguments():
+    import argparse
     parser = argparse.ArgumentParser(description="Run missile simulation with provided parameters")
     parser.add_argument("--bullet_name", type=str, required=True)
     parser.add_argument("--caliber", type=float, required=True)
@@ -94,47 +44,43 @@ def parse_arguments():
     return vars(parser.parse_args())
 
 
+FULL_FLIGHT = StopConditions()
+
+
 def get_rho(altitude):
-    # Given data
-    altitudes = np.array([0, 1000, 2000, 3000, 5000, 8000, 10000, 12000, 15000, 20000])
-    rho_values = np.array([0.56, 0.53, 0.49, 0.44, 0.365, 0.3, 0.27, 0.23, 0.19, 0.15])
-    
-    # Create an interpolation function with extrapolation enabled
-    interp_func = interp1d(altitudes, rho_values, kind='linear', fill_value="extrapolate")
-    
-    # Calculate the rho value for the given altitude
-    rho = interp_func(altitude)
-    
-    return rho
-
-def compute_dependent_variables(args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude):
+    return atmosphere.rho(altitude)
+
+def compute_dependent_variables(args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator="fixed", cancel_event=None, stop=None):
+    """Simulate one flight. stop (StopConditions) can end it before time_life / max_distance, the arrays hold the rows flown."""
+    profile = as_profile(args)
+    stop = stop or FULL_FLIGHT
+    # Without a target there is nothing to intercept or close on
+    has_target = initial_target_distance > 0
+
+    # integrator="adaptive" uses error-controlled steps with exact event times instead of the fixed 0.01 s step
+    if integrator == "adaptive":
+        adaptive_start = instrumentation.start()
+        results = integrate_adaptive(profile, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, cancel_event=cancel_event, stop=stop)[0]
+        instrumentation.record("integration (adaptive)", adaptive_start, missile=profile.name, steps=len(results[0]) - 1)
+        return results
+    elif integrator != "fixed":
+        raise ValueError(f"Unknown integrator: {integrator}")
+
+    setup_start = instrumentation.start()
     start_speed_ias = tas_to_ias(start_speed, launch_altitude)
 
     # Constants
-    g = 9.81  # gravitational acceleration (m/s^2)
     time_interval=0.01
-    # Time array
-    times = np.arange(0, args["time_life"] + time_interval, time_interval)
+    # Time, mass and thrust arrays (shared by every flight of the profile, up to time_life)
+    times, true_mass, true_thrust = profile.schedule(time_interval)
     n = len(times)
 
-    # Initialize arrays
-    true_mass = np.zeros(n)
-    true_thrust = np.zeros(n)
-    speeds = np.zeros(n)
-    horizontal_speeds = np.zeros(n)
-    vertical_speeds = np.zeros(n)
-    drags = np.zeros(n)
-    accelerations = np.zeros(n)
-    horizontal_distances = np.zeros(n)
-    vertical_distances = np.zeros(n)
-    target_distances = np.zeros(n)
-    true_acceleration = np.zeros(n)
-    thrust_to_weights = np.zeros(n)
-    angle = np.zeros(n)
-    turn_rates = np.zeros(n)
-    g_load = np.zeros(n)
-    turn_radius = np.zeros(n)
-    tas_speed = np.zeros(n)
+    # State arrays, one row each. They start at one kernel chunk and grow as the flight goes on,
+    # so flights ended early by max_distance or a stop condition don't allocate up to time_life.
+    capacity = min(n, integration_kernel.KERNEL_CHUNK + 1)
+    state = np.zeros((integration_kernel.STATE_ARRAYS, capacity))
+    (speeds, horizontal_speeds, vertical_speeds, drags, accelerations, horizontal_distances, vertical_distances, target_distances,
+     true_acceleration, thrust_to_weights, angle, turn_rates, g_load, turn_radius, tas_speed) = state
 
     # Set initial values
     speeds[0] = start_speed_ias * (1000 / 3600)  # Convert km/h to m/s
@@ -145,378 +91,298 @@ def compute_dependent_variables(args, start_speed, launch_altitude, target_speed
     vertical_distances[0] = launch_altitude  # Initial altitude
     angle[0] = 0
     tas_speed[0] = start_speed / 3.6
-    aoa = np.radians(args.get("aoa"))
-    tvc = np.radians(args.get("tvc"))
-    max_load = args.get("overload")
-    D = args.get("dist_cm_stab")
-
-    # Get loft angles if there are any
-    loft_climb_angle = args.get("loft_elevation")
-    loft_dive_angle = args.get("loft_target_elevation")
-    loft_omegamax = args.get("loft_omega_max")
-    distance_check = args.get("lock_distance")
-    loft_accel = args.get("loft_acceleration") 
-
-    # Convert angles to radians if they are not zero and set the climbing mode
-    if loft_climb_angle and loft_dive_angle and loft_omegamax != 0:
-        loft_climb_angle = np.radians(loft_climb_angle)
-        loft_dive_angle = np.radians(loft_dive_angle)
-        loft_omega_max = np.radians(loft_omegamax*9) * time_interval
-        lofting = True
-        climbing = True
-        diving = False
-    else:
-        lofting = False
-        climbing = False
-        diving = False
-
-    # Segment 1: First phase burn
-    timefire_steps = int(np.ceil((args["time_fire_booster"] + time_interval) / time_interval)) if args["time_fire_booster"] != 0 else 0
-    mass_decrease_rate1 = (args["mass"] - args["mass_end_booster"]) / (timefire_steps - 1)
-    for i in range(min(timefire_steps, n)):
-        true_mass[i] = args["mass"] - i * mass_decrease_rate1
-        true_thrust[i] = args["force_booster"]
-
-    # Segment 2: Second phase burn (if applicable)
-    if args["time_fire_sustainer"] > 0 and args["force_sustainer"] > 0 and args["mass_end_sustainer"] > 0:
-        timefire1_steps = int(np.ceil((args["time_fire_sustainer"] + time_interval) / time_interval))
-        mass_decrease_rate2 = (args["mass_end_booster"] - args["mass_end_sustainer"]) / (timefire1_steps - 1)
-        for i in range(timefire_steps, min(timefire_steps + timefire1_steps, n)):
-            true_mass[i] = args["mass_end_booster"] - (i - timefire_steps) * mass_decrease_rate2
-            true_thrust[i] = args["force_sustainer"]
-    else:
-        timefire1_steps = 0
-
-    # Segment 3: Coasting phase
-    for i in range(timefire_steps + timefire1_steps, n):
-        true_mass[i] = args["mass_end_booster"] if args["mass_end_sustainer"] == 0 else args["mass_end_sustainer"]
-        true_thrust[i] = 0
+
+    # Steps run in integration_kernel (compiled with Numba when installed), a chunk at a time so the job can be cancelled
+    integrate_steps, ias_ratio_table, rho_table = integration_kernel.kernel()
+    parameters = np.zeros(integration_kernel.PARAMETER_COUNT)
+    parameters[integration_kernel.P_CXK] = profile.cxk
+    parameters[integration_kernel.P_AREA] = profile.area
+    parameters[integration_kernel.P_TARGET_SPEED] = target_speed
+    parameters[integration_kernel.P_TARGET_ALTITUDE] = target_altitude
+    parameters[integration_kernel.P_LOFT_ACCEL] = profile.loft_acceleration
+    # Loft angles are already in radians when the missile lofts
+    parameters[integration_kernel.P_LOFT_CLIMB_ANGLE] = profile.loft_climb_angle
+    parameters[integration_kernel.P_LOFT_DIVE_ANGLE] = profile.loft_dive_angle
+    parameters[integration_kernel.P_DISTANCE_CHECK] = profile.lock_distance
+    parameters[integration_kernel.P_LOFT_OMEGA_MAX] = profile.loft_omega_rate * time_interval
+    parameters[integration_kernel.P_TVC] = np.radians(profile.tvc)
+    parameters[integration_kernel.P_MAX_LOAD] = profile.overload
+    parameters[integration_kernel.P_D] = profile.dist_cm_stab
+    parameters[integration_kernel.P_CL] = profile.Cl
+    parameters[integration_kernel.P_WING_AREA] = profile.wing_area
+    parameters[integration_kernel.P_END_SPEED] = profile.end_speed
+    parameters[integration_kernel.P_TIMEOUT] = profile.timeout
+    parameters[integration_kernel.P_MAX_DISTANCE] = np.inf if profile.max_distance is None else profile.max_distance
+    parameters[integration_kernel.P_TIME_INTERVAL] = time_interval
+    parameters[integration_kernel.P_STOP_INTERCEPT] = stop.intercept and has_target
+    parameters[integration_kernel.P_STOP_CLOSING] = stop.closing and has_target
+    parameters[integration_kernel.P_KILL_SPEED] = stop.kill_speed
+    parameters[integration_kernel.P_STOP_GROUND] = stop.ground
+    # lofting, climbing, diving
+    flags = np.array([profile.lofting, profile.lofting, False], dtype=np.int64)
+
+    instrumentation.record("setup", setup_start, missile=profile.name)
 
     # Compute dynamics
-    for i in range(1, n):
-        rho = get_rho(vertical_distances[i-1])
-        area = np.pi * (args["caliber"] / 2) ** 2  # Cross section area
-
-        thrust_ias = tas_to_ias(true_thrust[i], vertical_distances[i-1])
-        drags[i] = 0.5 * rho * speeds[i-1] ** 2 * args["cxk"] * area  # Drag computation
-        accelerations[i] = (thrust_ias - drags[i]) / true_mass[i]  # Thrust acceleration
-
-        intersection_time = (target_distances[i-1] - horizontal_distances[i-1]) / (horizontal_speeds[i-1] - target_speed * (1000 / 3600)) if target_speed != 0 else 0  # Predicted interception distance
-        desired_altitude_change = target_altitude - vertical_distances[i-1]  # Climbing or diving distance
-        angle1 = np.arctan(desired_altitude_change / (intersection_time * speeds[i-1])) if target_speed != 0 else 0
-        dive_check = np.arctan(desired_altitude_change/(target_distances[i-1] - horizontal_distances [i-1])) if target_speed != 0 else 0
-        desired_loft_angle = min(abs(true_acceleration[i-1]) * loft_accel * 0.005, loft_climb_angle)
-        
-        if distance_check > 0:
-            if target_distances[i-1] - horizontal_distances[i-1] < distance_check/2:
-                if lofting:
-                    climbing = False
-                    diving = True
-
-        # Altitude functions
-        if target_distances[i-1] - horizontal_distances[i-1] <= 0:
-            angle[i] = 0
-        elif target_altitude > vertical_distances[i-1]:
-            angle[i]= angle1
-        elif lofting:
-            if climbing:
-                angle[i] = min(desired_loft_angle, angle[i-1] + loft_omega_max) if desired_loft_angle > angle[i-1] + loft_omega_max else max(desired_loft_angle, angle[i-1] - loft_omega_max)
-
-                if abs(dive_check) >= loft_dive_angle:
-                    diving = True
-                    climbing = False
-            elif diving:
-                if angle1 > 0:
-                    angle[i] = min(angle[i-1]-loft_omega_max, angle1)
-                elif angle1 < 0:
-                    angle[i] = max(angle[i-1]-loft_omega_max, angle1)
-                else:
-                    angle[i] = angle1
-        else:
-            if desired_altitude_change == 0:
-                angle[i] = 0
-            else:
-                angle[i] = angle1
-
-        # Compute acceleration components based on the angle
-        thrust_acceleration_x = accelerations[i] * np.cos(angle[i])
-        thrust_acceleration_y = accelerations[i] * np.sin(angle[i])
-        gravity_acceleration_y = -g * np.sin(angle[i])
-
-        thrust_to_weights[i] = true_thrust[i] / true_mass[i]
-        # True acceleration in the rocket's direction
-        true_acceleration[i] = np.sign(accelerations[i]) * np.sqrt(thrust_acceleration_x ** 2 + thrust_acceleration_y ** 2) + gravity_acceleration_y
-
-        # Update speeds and distances
-        speeds[i] = speeds[i-1] + true_acceleration[i] * time_interval
-        tas_speed[i] = ias_to_tas(speeds[i], vertical_distances[i-1])
-        if args["end_speed"] != 0:
-            tas_speed[i] = min(tas_speed[i], args["end_speed"])  # Cap the speed at max speed if provided
-            speeds[i] = tas_to_ias(tas_speed[i], vertical_distances[i-1])
-        # Separate x and y components from the true speed
-        horizontal_speeds[i] = tas_speed[i] * np.cos(angle[i])
-        vertical_speeds[i] = tas_speed[i] * np.sin(angle[i])
-
-
-        horizontal_distances[i] = horizontal_distances[i-1] + horizontal_speeds[i] * time_interval  # Update horizontal distance
-        vertical_distances[i] = vertical_distances[i-1] + vertical_speeds[i] * time_interval  # Update altitude
-        target_distances[i] = target_distances[i-1] + target_speed * (1000 / 3600) * time_interval  # Update target distance
-
-        if 0 < aoa < np.pi/8 or 7*np.pi/8 < aoa < np.pi:
-            Cl = np.sin(6*aoa)
-        elif np.pi/8 <= aoa <= 7*np.pi/8:
-            Cl = np.sin(2*aoa)
-        else:
-            Cl = 0
-        
-        turn_rate = ((Cl * args["wing_area"] * 0.5 * rho * (speeds[i]**2) * D)/true_mass[i] + (tvc*D*true_thrust[i])/(true_mass[i])) * time_interval
-        radius_check = tas_speed[i]/turn_rate
-        load_check = (tas_speed[i]**2)/(radius_check*g)
-
-        if args["timeout"] <= times[i]:
-            if max_load == 0:
-                turn_rates[i] = turn_rate
-                turn_radius[i] = radius_check
-                g_load[i] = load_check               
-            elif load_check < max_load:
-                turn_rates[i] = turn_rate
-                turn_radius[i] = radius_check
-                g_load[i] = load_check
-            else:
-                g_load[i] = max_load
-                turn_radius[i] = (tas_speed[i] ** 2)/(max_load*g)
-                turn_rates[i] = tas_speed[i]/turn_radius[i]
-        else:
-            turn_rates[i] = 0
-            turn_radius[i] = 0
-            g_load[i] = 0
-
-        # Stop if max distance is reached and provided
-        if args["max_distance"] is not None and horizontal_distances[i] > args["max_distance"]:
-            trunc_index = i + 1
-            times = times[:trunc_index]
-            true_mass = true_mass[:trunc_index]
-            true_thrust = true_thrust[:trunc_index]
-            speeds = speeds[:trunc_index]
-            horizontal_speeds = horizontal_speeds[:trunc_index]
-            vertical_speeds = vertical_speeds[:trunc_index]
-            drags = drags[:trunc_index]
-            accelerations = accelerations[:trunc_index]
-            horizontal_distances = horizontal_distances[:trunc_index]
-            vertical_distances = vertical_distances[:trunc_index]
-            target_distances = target_distances[:trunc_index]
-            true_acceleration = true_acceleration[:trunc_index]
-            thrust_to_weights = thrust_to_weights[:trunc_index]
-            angle = angle[:trunc_index]
-            g_load = g_load[:trunc_index]
-            turn_rates = turn_rates[:trunc_index]  
-            turn_radius = turn_radius[:trunc_index]
-            tas_speed = tas_speed[:trunc_index]        
+    loop_start = instrumentation.start()
+    rows = n
+    for first in range(1, n, integration_kernel.KERNEL_CHUNK):
+        # Background jobs can be cancelled (threading.Event)
+        if cancel_event is not None and cancel_event.is_set():
+            raise SimulationCancelled()
+
+        last = min(first + integration_kernel.KERNEL_CHUNK, n)
+        if last > capacity:
+            capacity = min(n, max(last, 2 * capacity))
+            grown = np.zeros((integration_kernel.STATE_ARRAYS, capacity))
+            grown[:, :first] = state[:, :first]
+            state = grown
+            (speeds, horizontal_speeds, vertical_speeds, drags, accelerations, horizontal_distances, vertical_distances, target_distances,
+             true_acceleration, thrust_to_weights, angle, turn_rates, g_load, turn_radius, tas_speed) = state
+
+        trunc_index = integrate_steps(first, last, times, true_mass, true_thrust, speeds, horizontal_speeds,
+                                      vertical_speeds, drags, accelerations, horizontal_distances, vertical_distances, target_distances,
+                                      true_acceleration, thrust_to_weights, angle, turn_rates, g_load, turn_radius, tas_speed,
+                                      parameters, flags, ias_ratio_table, rho_table)
+
+        # Stop if max distance is reached or a stop condition ended the flight
+        if trunc_index:
+            rows = trunc_index
             break
 
-    mach_numbers = [get_mach_number(tas * 3.6, vertical_distances[i]) for i, tas in enumerate(tas_speed)]
-    accelerations_tas = [ias_to_tas(acceleration, vertical_distances[i]) for i, acceleration in enumerate(accelerations)]
+    # Keep only the rows flown (no copy when the flight used the whole buffer)
+    state = np.ascontiguousarray(state[:, :rows])
+    (speeds, horizontal_speeds, vertical_speeds, drags, accelerations, horizontal_distances, vertical_distances, target_distances,
+     true_acceleration, thrust_to_weights, angle, turn_rates, g_load, turn_radius, tas_speed) = state
+    times = times[:rows]
+    true_mass = true_mass[:rows]
+    true_thrust = true_thrust[:rows]
+
+    instrumentation.record("integration loop", loop_start, missile=profile.name, steps=rows - 1)
+
+    with instrumentation.span("Mach/TAS post-processing", missile=profile.name):
+        mach_numbers = mach_number_array(tas_speed * 3.6, vertical_distances)
+        accelerations_tas = ias_to_tas_array(accelerations, vertical_distances)
 
 
     return times, true_mass, true_thrust, tas_speed, mach_numbers, drags, accelerations_tas, horizontal_distances, vertical_distances, target_distances, thrust_to_weights, g_load, turn_radius, turn_rates
 
-def generate_missile_graph(args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude):
-    times, true_mass, true_thrust, speeds_tas, mach_numbers, drags, accelerations, horizontal_distances, vertical_distances, target_distances, thrust_to_weights, g_load, turn_radius, turn_rates = compute_dependent_variables(
-        args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude
-    )
-
-    fig, axs = plt.subplots(2, 2, figsize=(16, 10), facecolor="dimgrey")
-    # Plot 1: Time vs Speed
-    ax_speed = axs[0, 0]
-    ax_mach = ax_speed.twinx()
-    line_mach, = ax_mach.plot(times, mach_numbers, label='Mach', color='b')
-    line_speed, = ax_speed.plot(times, speeds_tas, label='Speed', color='c')
-    ax_speed.set_title(f'{args["name"]}')
-    ax_mach.set_ylabel('Mach number')
-    ax_mach.grid(False)
-    ax_mach.patch.set_facecolor("grey")
-    ax_speed.set_xlabel('Time (s)')
-    ax_speed.set_ylabel('Speed TAS (m/s)')
-    ax_speed.grid(True, color="black")
-    ax_speed.patch.set_facecolor("grey")
-    ax_mach.legend(loc='lower right')
-    ax_speed.legend(loc='upper right')
-
-    # Plot 2: Time vs Distance
-    ax_distance = axs[0, 1]
-    line_horizontal_distance, = ax_distance.plot(times, horizontal_distances, label='Horizontal Distance', color='b')
-    ax_distance.set_xlabel('Time (s)')
-    ax_distance.set_ylabel('Distance (m)')
-    ax_distance.grid(True, color='black')
-    ax_distance.patch.set_facecolor("grey")
-
-    # Plot 3: Time vs Acceleration
-    ax_acceleration = axs[1, 0]
-    line_acceleration, = ax_acceleration.plot(times, accelerations, label='Acceleration', color='b')
-    ax_acceleration.set_xlabel('Time (s)')
-    ax_acceleration.set_ylabel('Acceleration (m/s²)')
-    ax_acceleration.grid(True, color="black")
-    ax_acceleration.patch.set_facecolor("grey")
-
-    # Plot 4: Time vs Drag
-    ax_drag = axs[1, 1]
-    line_drag, = ax_drag.plot(times, drags, label='Drag', color='b')
-    ax_drag.set_xlabel('Time (s)')
-    ax_drag.set_ylabel('Drag (N)')
-    ax_drag.grid(True, color="black")
-    ax_drag.patch.set_facecolor("grey")
-
-    plt.tight_layout(rect=[0, 0, 1, 1])
-
-    fig1, axs1 = plt.subplots(1, 2, figsize=(20, 10), facecolor="dimgrey")
-
-
-    # Plot 1-1: Hor and Vert distances
-    ax_distance1 = axs1[0]
-    line_vertical_distance = ax_distance1.plot(times, vertical_distances, label='Altitude', color='g')
-    line_target_distance = ax_distance1.plot(times, target_distances, label='Target Distance', color='r')
-    line_horizontal_distance, = ax_distance1.plot(times, horizontal_distances, label='Horizontal Distance', color='b')
-    ax_distance1.set_title(f"{initial_target_distance}km, {launch_altitude}m, {start_speed}km/h, \ntarget going {target_speed}km/h at {launch_altitude}m")
-    ax_distance1.set_xlabel('Time (s)')
-    ax_distance1.set_ylabel('Distance (m)')
-    ax_distance1.legend(loc='upper left')
-    ax_distance1.grid(True, color='black')
-    ax_distance1.patch.set_facecolor("grey")
-
-    # Plot 1-2: T/W
-
-    ax_twr = axs1[1]
-    line_thrust_weight = ax_twr.plot(times, thrust_to_weights, label='T/W', color='g')
-    ax_twr.set_xlabel('Time (s)')
-    ax_twr.set_ylabel('T/W')
-    ax_twr.grid(True, color="black")
-    ax_twr.patch.set_facecolor("grey")
-
-    fig2, axs2 = plt.subplots(1, 2, figsize=(10,20), facecolor="dimgrey")
-
-    ax_g = axs2[0]
-    line_g = ax_g.plot(times, g_load, label='G load', color='b')
-    ax_g.set_xlabel('Time (s)')
-    ax_g.set_ylabel('G load')
-    ax_g.grid(True, color="black")
-    ax_g.patch.set_facecolor("grey")
-
-    ax_turn = axs2[1]
-    line_turn_radius = ax_turn.plot(times, turn_radius, label='Turn radius', color='b')
-    ax_turn.set_xlabel('Time (s)')
-    ax_turn.set_ylabel('Turn radius (m)')
-    ax_turn.grid(True, color="black")
-    ax_turn.patch.set_facecolor("grey")
-
-    return fig, fig1, fig2
-
-
-def generate_comparison_graph(args1, args2,start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude):
-    args = args1
-    times, true_mass, true_thrust, speeds_tas, mach_numbers, drags, accelerations, horizontal_distances, vertical_distances, target_distances, thrust_to_weights, g_load, turn_radius, turn_rates = compute_dependent_variables(
-        args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude
-    )
-    args = args2
-    times2, true_mass2, true_thrust2, speeds_tas2, mach_numbers2, drags2, accelerations2, horizontal_distances2, vertical_distances2, target_distances2, thrust_to_weights2, g_load2, turn_radius2, turn_rates2 = compute_dependent_variables(
-        args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude
-    )
-
-    fig, axs = plt.subplots(2, 2, figsize=(16, 10), facecolor="dimgrey")
-    # Plot 1: Time vs Speed
-    ax_speed = axs[0, 0]
-    ax_mach = ax_speed.twinx()
-    line_mach, = ax_mach.plot(times, mach_numbers,label=f'Mach {args1["name"]}', color='b')
-    line_mach1, = ax_mach.plot(times2, mach_numbers2, label=f'Mach {args2["name"]}', color='c')
-    line_speed, = ax_speed.plot(times, speeds_tas, label=f'Speed {args1["name"]}', color='r')
-    line_speed1, = ax_speed.plot(times2, speeds_tas2, label=f'Speed {args2["name"]}', color='g')
-    ax_speed.set_title(f'{args1["name"]}, {args2["name"]}')
-    ax_mach.set_ylabel('Mach number')
-    ax_mach.grid(False)
-    ax_mach.patch.set_facecolor("grey")   
-    ax_speed.set_xlabel('Time (s)')
-    ax_speed.set_ylabel('Speed TAS (m/s)')
-    ax_speed.grid(True, color="black")
-    ax_speed.patch.set_facecolor("grey")
-    ax_mach.legend(loc='lower right')
-    ax_speed.legend(loc='upper right')
-
-    # Plot 2: Time vs Distance
-    ax_distance = axs[0, 1]
-    line_horizontal_distance, = ax_distance.plot(times, horizontal_distances, label=f'Hor Dist {args1["name"]}', color='b')
-    line_horizontal_distance1, = ax_distance.plot(times2, horizontal_distances2, label=f'Hor Dist {args2["name"]}', color='c')
-    ax_distance.set_xlabel('Time (s)')
-    ax_distance.set_ylabel('Distance (m)')
-    ax_distance.grid(True, color='black')
-    ax_distance.patch.set_facecolor("grey")
-
-    # Plot 3: Time vs Acceleration
-    ax_acceleration = axs[1, 0]
-    line_acceleration, = ax_acceleration.plot(times, accelerations, label=f'Acceleration {args1["name"]}', color='b')
-    line_acceleration1, = ax_acceleration.plot(times2, accelerations2, label=f'Acceleration {args2["name"]}', color='c')
-    ax_acceleration.set_xlabel('Time (s)')
-    ax_acceleration.set_ylabel('Acceleration (m/s²)')
-    ax_acceleration.grid(True, color="black")
-    ax_acceleration.patch.set_facecolor("grey")
-
-    # Plot 4: Time vs Drag
-    ax_drag = axs[1, 1]
-    line_drag, = ax_drag.plot(times, drags, label=f'Drag {args1["name"]}', color='b')
-    line_drag1, = ax_drag.plot(times2, drags2, label=f'Drag {args2["name"]}', color='c')
-    ax_drag.set_xlabel('Time (s)')
-    ax_drag.set_ylabel('Drag (N)')
-    ax_drag.grid(True, color="black")
-    ax_drag.patch.set_facecolor("grey")
-
-    plt.tight_layout(rect=[0, 0, 1, 1])
-
-    fig1, axs1 = plt.subplots(1, 2, figsize=(20, 10), facecolor="dimgrey")
-
-    # Plot 1-1: Hor and Vert distances
-    ax_distance1 = axs1[0]
-    ax_distance1.set_title(f"{initial_target_distance}km, {launch_altitude}m, {start_speed}km/h, \ntarget going {target_speed}km/h at {launch_altitude}m")
-    line_horizontal_distance, = ax_distance1.plot(times, horizontal_distances, label=f'Hor Dist {args1["name"]}', color='b')
-    line_horizontal_distance1, = ax_distance1.plot(times2, horizontal_distances2, label=f'Hor Dist {args2["name"]}', color='c')
-    line_vertical_distance, = ax_distance1.plot(times, vertical_distances, label=f'Alt {args1["name"]}', color='g')
-    line_vertical_distance1, = ax_distance1.plot(times2, vertical_distances2, label=f'Alt {args2["name"]}', color='y')
-    line_target_distance, = ax_distance1.plot(times, target_distances, label='Target Dist', color='r')
-    line_target_distance, = ax_distance1.plot(times2, target_distances2, color='r')
-
-    ax_distance1.set_xlabel('Time (s)')
-    ax_distance1.set_ylabel('Distance (m)')
-    ax_distance1.legend(loc='upper left')
-    ax_distance1.grid(True, color='black')
-    ax_distance1.patch.set_facecolor("grey")
-
-    # Plot 1-2: TWR
-    ax_twr = axs1[1]
-    line_thrust_weight1 = ax_twr.plot(times, thrust_to_weights, label=f'T/W {args1["name"]}', color='g')
-    line_thrust_weight2 = ax_twr.plot(times2, thrust_to_weights2, label=f'T/W {args2["name"]}', color='y')
-    ax_twr.set_xlabel('Time (s)')
-    ax_twr.set_ylabel('TWR')
-    ax_twr.grid(True, color="black")
-    ax_twr.patch.set_facecolor("grey")
-    ax_twr.legend(loc='upper right')
-
-    fig2, axs2 = plt.subplots(1, 2, figsize=(10,20), facecolor="dimgrey")
-
-    ax_g = axs2[0]
-    line_g = ax_g.plot(times, g_load, label=f'G load {args1['name']}', color='b')
-    line_g1 = ax_g.plot(times2, g_load2, label=f'G load {args2['name']}', color='c')
-    ax_g.set_xlabel('Time (s)')
-    ax_g.set_ylabel('G load')
-    ax_g.grid(True, color="black")
-    ax_g.patch.set_facecolor("grey")
-    ax_g.legend(loc='upper right')
-
-    ax_turn = axs2[1]
-    line_turn_radius = ax_turn.plot(times, turn_radius, label=f'Turn radius {args1['name']}', color='b')
-    line_turn_radius1 = ax_turn.plot(times2, turn_radius2, label=f'Turn radius {args2['name']}', color='c')
-    ax_turn.set_xlabel('Time (s)')
-    ax_turn.set_ylabel('Turn radius (m)')
-    ax_turn.grid(True, color="black")
-    ax_turn.patch.set_facecolor("grey")
-    ax_turn.legend(loc='upper right')
-
-
-
-    return fig, fig1, fig2
+# Lines of the graph tabs: (axes, index in the simulation results, colour per missile, label per missile).
+# Labels are formatted with the missile name.
+SINGLE_LINES = [
+    ("ax_mach", 4, ["b"], ["Mach"]),
+    ("ax_speed", 3, ["c"], ["Speed"]),
+    ("ax_distance", 7, ["b"], ["Horizontal Distance"]),
+    ("ax_acceleration", 6, ["b"], ["Acceleration"]),
+    ("ax_drag", 5, ["b"], ["Drag"]),
+    ("ax_distance1", 8, ["g"], ["Altitude"]),
+    ("ax_distance1", 9, ["r"], ["Target Distance"]),
+    ("ax_distance1", 7, ["b"], ["Horizontal Distance"]),
+    ("ax_twr", 10, ["g"], ["T/W"]),
+    ("ax_g", 11, ["b"], ["G load"]),
+    ("ax_turn", 12, ["b"], ["Turn radius"]),
+]
+
+COMPARISON_LINES = [
+    ("ax_mach", 4, ["b", "c"], ["Mach {}", "Mach {}"]),
+    ("ax_speed", 3, ["r", "g"], ["Speed {}", "Speed {}"]),
+    ("ax_distance", 7, ["b", "c"], ["Hor Dist {}", "Hor Dist {}"]),
+    ("ax_acceleration", 6, ["b", "c"], ["Acceleration {}", "Acceleration {}"]),
+    ("ax_drag", 5, ["b", "c"], ["Drag {}", "Drag {}"]),
+    ("ax_distance1", 7, ["b", "c"], ["Hor Dist {}", "Hor Dist {}"]),
+    ("ax_distance1", 8, ["g", "y"], ["Alt {}", "Alt {}"]),
+    ("ax_distance1", 9, ["r", "r"], ["Target Dist", "_nolegend_"]),
+    ("ax_twr", 10, ["g", "y"], ["T/W {}", "T/W {}"]),
+    ("ax_g", 11, ["b", "c"], ["G load {}", "G load {}"]),
+    ("ax_turn", 12, ["b", "c"], ["Turn radius {}", "Turn radius {}"]),
+]
+
+class GraphFigures:
+    """The three figures of the graph tabs, built once and updated in place.
+
+    update() pushes new trajectories into the existing lines with set_data,
+    so redrawing doesn't create figures, axes or canvases. comparison=True
+    gives the two missile layout.
+
+    Lines only hold a min/max decimated copy of each series, about two points
+    per pixel of the axes width. The full resolution arrays are kept and the
+    visible part is decimated again whenever the x limits change (zoom, pan).
+    """
+
+    def __init__(self, comparison=False):
+        # matplotlib is only loaded once a graph is made, it's the slowest import of the GUI
+        figures_start = instrumentation.start()
+        from matplotlib.figure import Figure
+
+        self.comparison = comparison
+        self.layout = COMPARISON_LINES if comparison else SINGLE_LINES
+        self.legends = {"ax_mach": "lower right", "ax_speed": "upper right", "ax_distance1": "upper left"}
+        if comparison:
+            self.legends.update(ax_twr="upper right", ax_g="upper right", ax_turn="upper right")
+
+        # Figures are built without pyplot so they can be created off the main thread and are freed with their canvas
+        self.fig = Figure(figsize=(16, 10), facecolor="dimgrey")
+        axs = self.fig.subplots(2, 2)
+        # Plot 1: Time vs Speed
+        self.ax_speed = axs[0, 0]
+        self.ax_mach = self.ax_speed.twinx()
+        self.ax_mach.set_ylabel('Mach number')
+        self.ax_mach.grid(False)
+        self.ax_mach.patch.set_facecolor("grey")
+        self.ax_speed.set_xlabel('Time (s)')
+        self.ax_speed.set_ylabel('Speed TAS (m/s)')
+        self.ax_speed.grid(True, color="black")
+        self.ax_speed.patch.set_facecolor("grey")
+
+        # Plot 2: Time vs Distance
+        self.ax_distance = axs[0, 1]
+        self.ax_distance.set_xlabel('Time (s)')
+        self.ax_distance.set_ylabel('Distance (m)')
+        self.ax_distance.grid(True, color='black')
+        self.ax_distance.patch.set_facecolor("grey")
+
+        # Plot 3: Time vs Acceleration
+        self.ax_acceleration = axs[1, 0]
+        self.ax_acceleration.set_xlabel('Time (s)')
+        self.ax_acceleration.set_ylabel('Acceleration (m/s²)')
+        self.ax_acceleration.grid(True, color="black")
+        self.ax_acceleration.patch.set_facecolor("grey")
+
+        # Plot 4: Time vs Drag
+        self.ax_drag = axs[1, 1]
+        self.ax_drag.set_xlabel('Time (s)')
+        self.ax_drag.set_ylabel('Drag (N)')
+        self.ax_drag.grid(True, color="black")
+        self.ax_drag.patch.set_facecolor("grey")
+
+        self.fig.tight_layout(rect=[0, 0, 1, 1])
+
+        self.fig1 = Figure(figsize=(20, 10), facecolor="dimgrey")
+        axs1 = self.fig1.subplots(1, 2)
+
+        # Plot 1-1: Hor and Vert distances
+        self.ax_distance1 = axs1[0]
+        self.ax_distance1.set_xlabel('Time (s)')
+        self.ax_distance1.set_ylabel('Distance (m)')
+        self.ax_distance1.grid(True, color='black')
+        self.ax_distance1.patch.set_facecolor("grey")
+
+        # Plot 1-2: T/W
+        self.ax_twr = axs1[1]
+        self.ax_twr.set_xlabel('Time (s)')
+        self.ax_twr.set_ylabel('TWR' if comparison else 'T/W')
+        self.ax_twr.grid(True, color="black")
+        self.ax_twr.patch.set_facecolor("grey")
+
+        self.fig2 = Figure(figsize=(10,20), facecolor="dimgrey")
+        axs2 = self.fig2.subplots(1, 2)
+
+        self.ax_g = axs2[0]
+        self.ax_g.set_xlabel('Time (s)')
+        self.ax_g.set_ylabel('G load')
+        self.ax_g.grid(True, color="black")
+        self.ax_g.patch.set_facecolor("grey")
+
+        self.ax_turn = axs2[1]
+        self.ax_turn.set_xlabel('Time (s)')
+        self.ax_turn.set_ylabel('Turn radius (m)')
+        self.ax_turn.grid(True, color="black")
+        self.ax_turn.patch.set_facecolor("grey")
+
+        # One Line2D per missile for every entry of the layout, in plotting order
+        self.lines = []
+        for axis_name, index, colors, labels in self.layout:
+            axis = getattr(self, axis_name)
+            self.lines.append([axis.plot([], [], color=color)[0] for color in colors])
+
+        # Full resolution (x, y) of each line
+        self.full_data = {}
+        for axis_name in dict.fromkeys(entry[0] for entry in self.layout):
+            getattr(self, axis_name).callbacks.connect('xlim_changed', self._redecimate)
+        instrumentation.record("create figures", figures_start, comparison=comparison)
+
+    def figures(self):
+        return self.fig, self.fig1, self.fig2
+
+    def update(self, names, results, start_speed, launch_altitude, target_speed, initial_target_distance):
+        """Show the simulation results of each missile (one tuple per name)."""
+        update_start = instrumentation.start()
+        for (axis_name, index, colors, labels), lines in zip(self.layout, self.lines):
+            for line, label, name, result in zip(lines, labels, names, results):
+                self.full_data[line] = (result[0], result[index])
+                line.set_data(*minmax_decimate(result[0], result[index], line.axes.bbox.width))
+                line.set_label(label.format(name))
+
+        self.ax_speed.set_title(", ".join(names))
+        self.ax_distance1.set_title(f"{initial_target_distance}km, {launch_altitude}m, {start_speed}km/h, \ntarget going {target_speed}km/h at {launch_altitude}m")
+
+        for axis_name in dict.fromkeys(entry[0] for entry in self.layout):
+            axis = getattr(self, axis_name)
+            axis.relim()
+            axis.autoscale_view()
+        for axis_name, location in self.legends.items():
+            getattr(self, axis_name).legend(loc=location)
+
+        for figure in self.figures():
+            figure.canvas.draw_idle()
+        instrumentation.record("update figures", update_start, missiles=len(names))
+
+    def _redecimate(self, axis):
+        # Twin axes share the x limits but only the axes being zoomed gets the callback
+        x_min, x_max = axis.get_xlim()
+        for shared in axis.get_shared_x_axes().get_siblings(axis):
+            for line in shared.get_lines():
+                if line in self.full_data:
+                    line.set_data(*minmax_decimate(*self.full_data[line], shared.bbox.width, x_min, x_max))
+
+def simulate_missiles(args_list, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator="fixed", cache=None, cancel_event=None, stop=None):
+    """compute_dependent_variables for each missile. cache is an optional SimulationCache answering repeated requests."""
+    simulate = cache.compute if cache else compute_dependent_variables
+    with instrumentation.span("simulate", missiles=len(args_list), integrator=integrator):
+        return [simulate(args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator, cancel_event, stop) for args in args_list]
+
+def generate_missile_graph(args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator="fixed", cache=None, cancel_event=None, stop=None):
+    results = simulate_missiles([args], start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator, cache, cancel_event, stop)
+    figures = GraphFigures()
+    figures.update([args["name"]], results, start_speed, launch_altitude, target_speed, initial_target_distance)
+    return figures.figures()
+
+
+def generate_comparison_graph(args1, args2,start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator="fixed", cache=None, cancel_event=None, stop=None):
+    results = simulate_missiles([args1, args2], start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator, cache, cancel_event, stop)
+    figures = GraphFigures(comparison=True)
+    figures.update([args1["name"], args2["name"]], results, start_speed, launch_altitude, target_speed, initial_target_distance)
+    return figures.figures()
+
+
+def generate_envelope_graph(sweep, metric, x_axis, y_axis, missile_index=0):
+    from matplotlib.figure import Figure
+    axes = sweep["axes"]
+    labels = {
+        "start_speed": "Start Speed (km/h)",
+        "launch_altitude": "Launch Altitude (m)",
+        "target_speed": "Target Speed (km/h)",
+        "initial_target_distance": "Initial Target Distance (km)",
+        "target_altitude": "Target Altitude (m)",
+        "range": "Range (m)",
+        "time_to_target": "Time to target (s)",
+    }
+
+    # Axes that are not plotted are held at their first value
+    index = tuple(slice(None) if axis in (x_axis, y_axis) else 0 for axis in axes)
+    values = sweep[metric][missile_index][index]
+    if axes.index(x_axis) < axes.index(y_axis):
+        values = values.T
+    fixed = ", ".join(f"{axis}={sweep[axis][0]:g}" for axis in axes if axis not in (x_axis, y_axis))
+
+    fig = Figure(figsize=(16, 10), facecolor="dimgrey")
+    ax = fig.subplots()
+    mesh = ax.pcolormesh(sweep[x_axis], sweep[y_axis], values, shading='nearest', cmap='viridis')
+    colorbar = fig.colorbar(mesh, ax=ax)
+    colorbar.set_label(labels[metric])
+    ax.set_title(f'{sweep["names"][missile_index]} - {labels[metric]}\n{fixed}')
+    ax.set_xlabel(labels[x_axis])
+    ax.set_ylabel(labels[y_axis])
+    ax.patch.set_facecolor("grey")
+
+    return fig
@@ -0,0 +1,158 @@
+import os
+import re
+import json
+import hashlib
+
+# Bump when the on-disk layout changes
+HISTORY_FORMAT = 1
+HISTORY_DIR = os.path.join('saves_compiled_info', 'history')
+
+def record_hash(record):
+    """Content hash of a missile record, the same for equal records whatever their key order."""
+    text = json.dumps(record, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _write_json(path, data, indent=None):
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as file:
+        json.dump(data, file, indent=indent)
+    os.replace(temporary_path, path)
+
+class HistoryStore:
+    """Compiled info of every saved game version, each distinct missile record stored once.
+
+    objects/ holds the records by content hash, versions/ a manifest per
+    version ({missile name: hash}). index.json lists the versions in the
+    order they were saved with each version's changes from the one before
+    ({missile name: [old hash, new hash]}, None where missing), so
+    changed_missiles() only walks the changes instead of comparing whole
+    catalogues.
+    """
+
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = directory
+        self.index_file = os.path.join(directory, 'index.json')
+        self.index = {"format": HISTORY_FORMAT, "versions": []}
+        try:
+            with open(self.index_file, 'r') as file:
+                index = json.load(file)
+            if index.get("format") == HISTORY_FORMAT:
+                self.index = index
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error reading history index {self.index_file}: {e}")
+
+    def versions(self):
+        return [entry["version"] for entry in self.index["versions"]]
+
+    def _position(self, version):
+        for position, entry in enumerate(self.index["versions"]):
+            if entry["version"] == version:
+                return position
+        raise KeyError(version)
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.directory, 'objects', content_hash[:2], content_hash + '.json')
+
+    def _manifest_path(self, version):
+        return os.path.join(self.directory, 'versions', re.sub(r'[^A-Za-z0-9._-]', '_', version) + '.json')
+
+    def manifest(self, version):
+        """{missile name: record hash} of a saved version."""
+        with open(self._manifest_path(version), 'r') as file:
+            return json.load(file)["missiles"]
+
+    def record(self, content_hash):
+        with open(self._object_path(content_hash), 'r') as file:
+            return json.load(file)
+
+    def add_version(self, version, data):
+        """Save data ({missile name: record}) as version, replacing an earlier save of it. Returns the number of new records."""
+        os.makedirs(os.path.join(self.directory, 'versions'), exist_ok=True)
+        missiles = {}
+        new_records = 0
+        for name, record in data.items():
+            content_hash = record_hash(record)
+            missiles[name] = content_hash
+            path = self._object_path(content_hash)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _write_json(path, record)
+                new_records += 1
+        _write_json(self._manifest_path(version), {"version": version, "missiles": missiles})
+
+        versions = self.index["versions"]
+        try:
+            position = self._position(version)
+        except KeyError:
+            position = len(versions)
+            versions.append({"version": version, "changes": {}})
+        # The changes of this version and of the one saved after it are against the new manifest
+        previous = self.manifest(versions[position - 1]["version"]) if position > 0 else {}
+        versions[position]["changes"] = self._changes(previous, missiles)
+        if position + 1 < len(versions):
+            versions[position + 1]["changes"] = self._changes(missiles, self.manifest(versions[position + 1]["version"]))
+        _write_json(self.index_file, self.index)
+        return new_records
+
+    @staticmethod
+    def _changes(old, new):
+        changes = {name: [old.get(name), content_hash] for name, content_hash in new.items() if old.get(name) != content_hash}
+        changes.update({name: [content_hash, None] for name, content_hash in old.items() if name not in new})
+        return changes
+
+    def load_version(self, version):
+        """The version rebuilt in the compiled_info.json layout: {"version": ..., "data": {...}}."""
+        missiles = self.manifest(version)
+        return {"version": version, "data": {name: self.record(content_hash) for name, content_hash in missiles.items()}}
+
+    def changed_missiles(self, version1, version2):
+        """(added, removed, changed) missile names going from version1 to version2."""
+        position1 = self._position(version1)
+        position2 = self._position(version2)
+        first, last = sorted((position1, position2))
+
+        # Each change is [hash before, hash after] (None when missing), so the first change of a missile
+        # in the range gives its hash in the earlier version and the last one its hash in the later version
+        first_hash = {}
+        last_hash = {}
+        for entry in self.index["versions"][first + 1:last + 1]:
+            for name, (old_hash, new_hash) in entry["changes"].items():
+                first_hash.setdefault(name, old_hash)
+                last_hash[name] = new_hash
+        old, new = (first_hash, last_hash) if position1 <= position2 else (last_hash, first_hash)
+
+        added, removed, changed = [], [], []
+        for name in sorted(last_hash):
+            if old.get(name) == new.get(name):
+                continue
+            if old.get(name) is None:
+                added.append(name)
+            elif new.get(name) is None:
+                removed.append(name)
+            else:
+                changed.append(name)
+        return added, removed, changed
+
+    def import_saves(self, save_dir='saves_compiled_info'):
+        """Add the compiled_info_{version}.json copies saved by older versions of the program. Returns the imported versions."""
+        imported = []
+        saved = set(self.versions())
+        for filename in sorted(os.listdir(save_dir)):
+            match = re.fullmatch(r'compiled_info_(.*)\.json', filename)
+            if not match or match.group(1) in saved:
+                continue
+            file_path = os.path.join(save_dir, filename)
+            try:
+                with open(file_path, 'r') as file:
+                    compiled_info = json.load(file)
+            except Exception as e:
+                print(f"Error reading file {file_path}: {e}")
+                continue
+            version = compiled_info.get("version", match.group(1))
+            if version not in saved:
+                self.add_version(version, compiled_info.get("data", {}))
+                saved.add(version)
+                imported.append(version)
+        return imported
@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import threading
+
+# Opt-in timing of named spans (simulation phases, graph building, compiling, startup).
+# Disabled it costs one attribute check per span. Enable with enable() or by setting
+# MISSILEGRAPH_TRACE to the file the Chrome trace is written to (open it in chrome://tracing or Perfetto).
+# Only spans of this process are recorded: envelope sweep and dump workers are not traced.
+
+class Tracer:
+    """Completed spans as (name, start, end, thread id, args), perf_counter times."""
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_file = None
+        self.spans = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def record(self, name, start, end, **args):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.spans.append((name, start, end, threading.get_ident(), args))
+
+tracer = Tracer()
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        tracer.record(self.name, self.start, time.perf_counter(), **self.args)
+        return False
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_no_span = _NoSpan()
+
+def enable(trace_file=None):
+    tracer.enabled = True
+    tracer.trace_file = trace_file
+
+def span(name, **args):
+    """with span("name"): ... records the block's duration when tracing is enabled."""
+    return _Span(name, args) if tracer.enabled else _no_span
+
+def start():
+    """Start time for record(), for phases that don't fit in a with block."""
+    return time.perf_counter()
+
+def record(name, start_time, **args):
+    """Record a span from start_time (from start()) until now."""
+    if tracer.enabled:
+        tracer.record(name, start_time, time.perf_counter(), **args)
+
+def mark():
+    """Position in the recorded spans, for summary() of what ran after it."""
+    return len(tracer.spans)
+
+def summary(since=0):
+    """One line of total time per span name recorded after mark since, in first-seen order."""
+    with tracer.lock:
+        spans = tracer.spans[since:]
+    totals = {}
+    steps = {}
+    for name, start_time, end_time, thread, args in spans:
+        totals[name] = totals.get(name, 0.0) + end_time - start_time
+        if "steps" in args:
+            steps[name] = steps.get(name, 0) + args["steps"]
+
+    parts = []
+    for name, seconds in totals.items():
+        text = f"{name} {seconds * 1000:.0f} ms"
+        if name in steps and seconds > 0:
+            text += f" ({steps[name] / seconds / 1000:.0f}k steps/s)"
+        parts.append(text)
+    return " | ".join(parts)
+
+def write_trace(file_path=None):
+    """Write the spans as Chrome trace-event JSON ("X" complete events, microseconds)."""
+    file_path = file_path or tracer.trace_file
+    if not file_path:
+        return
+    with tracer.lock:
+        spans = list(tracer.spans)
+    pid = os.getpid()
+    events = [{
+        "name": name,
+        "ph": "X",
+        "ts": (start_time - tracer.origin) * 1e6,
+        "dur": (end_time - start_time) * 1e6,
+        "pid": pid,
+        "tid": thread,
+        "args": args,
+    } for name, start_time, end_time, thread, args in spans]
+    try:
+        with open(file_path, 'w') as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        print(f"Saved trace of {len(events)} spans to {file_path}")
+    except Exception as e:
+        print(f"Error saving trace {file_path}: {e}")
+
+if os.environ.get("MISSILEGRAPH_TRACE"):
+    enable(os.environ["MISSILEGRAPH_TRACE"])
@@ -0,0 +1,220 @@
+import os
+import warnings
+import numpy as np
+import atmosphere
+
+# The fixed-step loop of compute_dependent_variables. integrate_steps is compiled with
+# Numba when it is installed (pip install numba) and runs as plain Python otherwise;
+# both run the same source. MISSILEGRAPH_NO_JIT=1 forces the Python version.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Steps run per kernel call, the caller checks for cancellation between calls
+KERNEL_CHUNK = 4096
+
+# Parameter vector of integrate_steps
+(P_CXK, P_AREA, P_TARGET_SPEED, P_TARGET_ALTITUDE, P_LOFT_ACCEL, P_LOFT_CLIMB_ANGLE, P_LOFT_DIVE_ANGLE, P_DISTANCE_CHECK,
+ P_LOFT_OMEGA_MAX, P_TVC, P_MAX_LOAD, P_D, P_CL, P_WING_AREA, P_END_SPEED, P_TIMEOUT, P_MAX_DISTANCE, P_TIME_INTERVAL,
+ P_STOP_INTERCEPT, P_STOP_CLOSING, P_KILL_SPEED, P_STOP_GROUND) = range(22)
+PARAMETER_COUNT = 22
+# Arrays written by integrate_steps (speeds ... tas_speed), rows of one buffer in compute_dependent_variables
+STATE_ARRAYS = 15
+
+MIN_ALTITUDE = float(atmosphere.MIN_ALTITUDE)
+MAX_ALTITUDE = float(atmosphere.MAX_ALTITUDE)
+TABLE_STEP = float(atmosphere.TABLE_STEP)
+
+def integrate_steps(first, last, times, true_mass, true_thrust, speeds, horizontal_speeds, vertical_speeds, drags, accelerations,
+                    horizontal_distances, vertical_distances, target_distances, true_acceleration, thrust_to_weights, angle,
+                    turn_rates, g_load, turn_radius, tas_speed, parameters, flags, ias_ratio_table, rho_table):
+    """Steps first..last-1 of the fixed-step simulation, writing into the arrays.
+
+    flags holds [lofting, climbing, diving] and is updated for the next call.
+    Returns the number of valid rows when max_distance or one of the stop
+    conditions (P_STOP_*, P_KILL_SPEED) ends the flight in this range, 0 otherwise.
+    """
+    g = 9.81
+    cxk = parameters[P_CXK]
+    area = parameters[P_AREA]
+    target_speed = parameters[P_TARGET_SPEED]
+    target_altitude = parameters[P_TARGET_ALTITUDE]
+    loft_accel = parameters[P_LOFT_ACCEL]
+    loft_climb_angle = parameters[P_LOFT_CLIMB_ANGLE]
+    loft_dive_angle = parameters[P_LOFT_DIVE_ANGLE]
+    distance_check = parameters[P_DISTANCE_CHECK]
+    loft_omega_max = parameters[P_LOFT_OMEGA_MAX]
+    tvc = parameters[P_TVC]
+    max_load = parameters[P_MAX_LOAD]
+    D = parameters[P_D]
+    Cl = parameters[P_CL]
+    wing_area = parameters[P_WING_AREA]
+    end_speed = parameters[P_END_SPEED]
+    timeout = parameters[P_TIMEOUT]
+    max_distance = parameters[P_MAX_DISTANCE]
+    time_interval = parameters[P_TIME_INTERVAL]
+    stop_intercept = parameters[P_STOP_INTERCEPT] != 0
+    stop_closing = parameters[P_STOP_CLOSING] != 0
+    kill_speed = parameters[P_KILL_SPEED]
+    stop_ground = parameters[P_STOP_GROUND] != 0
+    lofting = flags[0] != 0
+    climbing = flags[1] != 0
+    diving = flags[2] != 0
+    last_index = len(rho_table) - 1
+
+    for i in range(first, last):
+        # Atmosphere at the previous altitude, same interpolation as atmosphere.rho / ias_ratio
+        altitude = vertical_distances[i-1]
+        if altitude < MIN_ALTITUDE or altitude > MAX_ALTITUDE:
+            raise ValueError("Altitude out of bounds for interpolation")
+        position = (altitude - MIN_ALTITUDE) / TABLE_STEP
+        index = int(position)
+        if index >= last_index:
+            rho = rho_table[last_index]
+            ias_ratio = ias_ratio_table[last_index]
+        else:
+            low = rho_table[index]
+            rho = low + (position - index) * (rho_table[index + 1] - low)
+            low = ias_ratio_table[index]
+            ias_ratio = low + (position - index) * (ias_ratio_table[index + 1] - low)
+
+        thrust_ias = true_thrust[i] * ias_ratio
+        drags[i] = 0.5 * rho * speeds[i-1] ** 2 * cxk * area  # Drag computation
+        accelerations[i] = (thrust_ias - drags[i]) / true_mass[i]  # Thrust acceleration
+
+        intersection_time = (target_distances[i-1] - horizontal_distances[i-1]) / (horizontal_speeds[i-1] - target_speed * (1000 / 3600)) if target_speed != 0 else 0.0  # Predicted interception distance
+        desired_altitude_change = target_altitude - vertical_distances[i-1]  # Climbing or diving distance
+        angle1 = np.arctan(desired_altitude_change / (intersection_time * speeds[i-1])) if target_speed != 0 else 0.0
+        dive_check = np.arctan(desired_altitude_change/(target_distances[i-1] - horizontal_distances [i-1])) if target_speed != 0 else 0.0
+        desired_loft_angle = min(abs(true_acceleration[i-1]) * loft_accel * 0.005, loft_climb_angle)
+
+        if distance_check > 0:
+            if target_distances[i-1] - horizontal_distances[i-1] < distance_check/2:
+                if lofting:
+                    climbing = False
+                    diving = True
+
+        # Altitude functions
+        if target_distances[i-1] - horizontal_distances[i-1] <= 0:
+            angle[i] = 0
+        elif target_altitude > vertical_distances[i-1]:
+            angle[i]= angle1
+        elif lofting:
+            if climbing:
+                angle[i] = min(desired_loft_angle, angle[i-1] + loft_omega_max) if desired_loft_angle > angle[i-1] + loft_omega_max else max(desired_loft_angle, angle[i-1] - loft_omega_max)
+
+                if abs(dive_check) >= loft_dive_angle:
+                    diving = True
+                    climbing = False
+            elif diving:
+                if angle1 > 0:
+                    angle[i] = min(angle[i-1]-loft_omega_max, angle1)
+                elif angle1 < 0:
+                    angle[i] = max(angle[i-1]-loft_omega_max, angle1)
+                else:
+                    angle[i] = angle1
+        else:
+            if desired_altitude_change == 0:
+                angle[i] = 0
+            else:
+                angle[i] = angle1
+
+        # Compute acceleration components based on the angle
+        thrust_acceleration_x = accelerations[i] * np.cos(angle[i])
+        thrust_acceleration_y = accelerations[i] * np.sin(angle[i])
+        gravity_acceleration_y = -g * np.sin(angle[i])
+
+        thrust_to_weights[i] = true_thrust[i] / true_mass[i]
+        # True acceleration in the rocket's direction
+        true_acceleration[i] = np.sign(accelerations[i]) * np.sqrt(thrust_acceleration_x ** 2 + thrust_acceleration_y ** 2) + gravity_acceleration_y
+
+        # Update speeds and distances
+        speeds[i] = speeds[i-1] + true_acceleration[i] * time_interval
+        tas_speed[i] = speeds[i] / ias_ratio
+        if end_speed != 0:
+            tas_speed[i] = min(tas_speed[i], end_speed)  # Cap the speed at max speed if provided
+            speeds[i] = tas_speed[i] * ias_ratio
+        # Separate x and y components from the true speed
+        horizontal_speeds[i] = tas_speed[i] * np.cos(angle[i])
+        vertical_speeds[i] = tas_speed[i] * np.sin(angle[i])
+
+        horizontal_distances[i] = horizontal_distances[i-1] + horizontal_speeds[i] * time_interval  # Update horizontal distance
+        vertical_distances[i] = vertical_distances[i-1] + vertical_speeds[i] * time_interval  # Update altitude
+        target_distances[i] = target_distances[i-1] + target_speed * (1000 / 3600) * time_interval  # Update target distance
+
+        turn_rate = ((Cl * wing_area * 0.5 * rho * (speeds[i]**2) * D)/true_mass[i] + (tvc*D*true_thrust[i])/(true_mass[i])) * time_interval
+        radius_check = tas_speed[i]/turn_rate
+        load_check = (tas_speed[i]**2)/(radius_check*g)
+
+        if timeout <= times[i]:
+            if max_load == 0:
+                turn_rates[i] = turn_rate
+                turn_radius[i] = radius_check
+                g_load[i] = load_check
+            elif load_check < max_load:
+                turn_rates[i] = turn_rate
+                turn_radius[i] = radius_check
+                g_load[i] = load_check
+            else:
+                g_load[i] = max_load
+                turn_radius[i] = (tas_speed[i] ** 2)/(max_load*g)
+                turn_rates[i] = tas_speed[i]/turn_radius[i]
+        else:
+            turn_rates[i] = 0
+            turn_radius[i] = 0
+            g_load[i] = 0
+
+        # Stop if max distance is reached (infinite when not provided) or a stop condition ends the flight
+        if (horizontal_distances[i] > max_distance
+                or (stop_intercept and horizontal_distances[i] >= target_distances[i])
+                or (stop_closing and true_thrust[i] == 0 and horizontal_speeds[i] <= target_speed * (1000 / 3600) and horizontal_distances[i] < target_distances[i])
+                or (kill_speed > 0 and true_thrust[i] == 0 and tas_speed[i] < kill_speed)
+                or (stop_ground and vertical_distances[i] <= 0)):
+            flags[1] = climbing
+            flags[2] = diving
+            return i + 1
+
+    flags[1] = climbing
+    flags[2] = diving
+    return 0
+
+_python_tables = (atmosphere.ias_ratio_table.tolist(), atmosphere.rho_table.tolist())
+# None until the first kernel() call with Numba, False when it couldn't compile the kernel
+_compiled = None
+
+def _warm_up(function):
+    # Numba compiles on the first call: run an empty range with the argument types compute_dependent_variables
+    # passes (read-only schedule arrays, rows of the state buffer) so compile and cache errors surface here
+    schedule = np.zeros(2)
+    schedule.flags.writeable = False
+    state = np.zeros((STATE_ARRAYS, 2))
+    function(1, 1, schedule, schedule, schedule, *state, np.zeros(PARAMETER_COUNT), np.zeros(3, dtype=np.int64),
+             atmosphere.ias_ratio_table, atmosphere.rho_table)
+
+def _compile():
+    """integrate_steps compiled with Numba, or False when it can't be compiled."""
+    error = None
+    # error_model="numpy" gives inf/nan on division by zero like the numpy scalars of the Python version.
+    # Without a writable cache location (e.g. a frozen executable) it is compiled again without the disk cache.
+    for cache in (True, False):
+        try:
+            compiled = numba.njit(cache=cache, error_model="numpy")(integrate_steps)
+            _warm_up(compiled)
+            return compiled
+        except Exception as e:
+            error = e
+    warnings.warn(f"Numba could not compile the simulation kernel, using the Python version: {type(error).__name__}: {error}", RuntimeWarning)
+    return False
+
+def use_jit():
+    return numba is not None and not os.environ.get("MISSILEGRAPH_NO_JIT")
+
+def kernel():
+    """(integrate_steps, ias ratio table, rho table): the compiled kernel with array tables, or the Python one with lists."""
+    global _compiled
+    if use_jit() and _compiled is None:
+        _compiled = _compile()
+    if not use_jit() or _compiled is False:
+        return (integrate_steps,) + _python_tables
+    return _compiled, atmosphere.ias_ratio_table, atmosphere.rho_table
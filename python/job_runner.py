@@ -0,0 +1,111 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cancellation import SimulationCancelled
+
+
+class Job:
+    """Handle passed to a running job function."""
+
+    def __init__(self, job_id, runner):
+        self.id = job_id
+        self.cancel_event = threading.Event()
+        self._runner = runner
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def report_progress(self, done, total):
+        """Thread-safe progress report, delivered to on_progress on the Tk thread."""
+        self._runner._results.put((self.id, "progress", (done, total)))
+
+
+class JobRunner:
+    """Runs GUI jobs on a worker thread and hands their results back to Tk via root.after.
+
+    Submitting a job supersedes the previous one: its cancel_event is set
+    and whatever it returns afterwards is dropped. on_busy(bool) is called
+    when the runner starts or stops working, e.g. to drive a progress bar.
+    """
+
+    def __init__(self, root, on_busy=None, poll_interval=50):
+        self.root = root
+        self.on_busy = on_busy
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="missilegraph-job")
+        self._results = queue.Queue()
+        self._current = None
+        self._callbacks = {}
+        self._next_id = 0
+        self._polling = False
+
+    def submit(self, function, on_done, on_error=None, on_progress=None):
+        """Run function(job) on the worker thread, then on_done(result) on the Tk thread."""
+        self.cancel()
+        self._next_id += 1
+        job = Job(self._next_id, self)
+        self._current = job
+        self._callbacks[job.id] = (on_done, on_error, on_progress)
+        self._executor.submit(self._run, job, function)
+        if self.on_busy:
+            self.on_busy(True)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+        return job
+
+    def cancel(self):
+        if self._current is not None:
+            self._current.cancel_event.set()
+            self._current = None
+            if self.on_busy:
+                self.on_busy(False)
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, function):
+        if job.cancelled():
+            self._results.put((job.id, "cancelled", None))
+            return
+        try:
+            self._results.put((job.id, "done", function(job)))
+        except SimulationCancelled:
+            self._results.put((job.id, "cancelled", None))
+        except Exception as e:
+            self._results.put((job.id, "error", e))
+
+    def _poll(self):
+        while True:
+            try:
+                job_id, status, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            on_done, on_error, on_progress = self._callbacks.get(job_id, (None, None, None))
+            current = self._current is not None and self._current.id == job_id
+            if status == "progress":
+                if current and on_progress:
+                    on_progress(*value)
+                continue
+
+            # The job is finished, stale results are dropped
+            self._callbacks.pop(job_id, None)
+            if not current:
+                continue
+            self._current = None
+            if self.on_busy:
+                self.on_busy(False)
+            if status == "done":
+                on_done(value)
+            elif status == "error":
+                if on_error:
+                    on_error(value)
+                else:
+                    print(f"Error in background job: {value}")
+
+        if self._current is not None or self._callbacks:
+            self.root.after(self.poll_interval, self._poll)
+        else:
+            self._polling = False
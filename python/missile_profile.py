@@ -0,0 +1,237 @@
+import hashlib
+import math
+from collections.abc import Mapping
+import numpy as np
+
+# Simulation parameters: (attribute, compiled_info.json key, default). A default of None means required.
+PROFILE_FIELDS = [
+    ("caliber", "caliber", None),
+    ("cxk", "cxk", None),
+    ("mass", "mass", None),
+    ("mass_end_booster", "mass_end_booster", None),
+    ("mass_end_sustainer", "mass_end_sustainer", 0),
+    ("time_fire_booster", "time_fire_booster", None),
+    ("time_fire_sustainer", "time_fire_sustainer", 0),
+    ("force_booster", "force_booster", None),
+    ("force_sustainer", "force_sustainer", 0),
+    ("time_life", "time_life", None),
+    ("end_speed", "end_speed", None),
+    ("max_distance", "max_distance", 0),
+    ("pressure0", "pressure0", 760),
+    ("temperature0", "temperature0", 18),
+    ("loft_elevation", "loft_elevation", 0),
+    ("loft_target_elevation", "loft_target_elevation", 0),
+    ("loft_omega_max", "loft_omega_max", 0),
+    ("loft_acceleration", "loft_angle_acceleration", 0),
+    ("lock_distance", "lock_distance", 0),
+    ("aoa", "aoa", 0),
+    ("tvc", "tvc", 0),
+    ("overload", "overload", 0),
+    ("dist_cm_stab", "dist_cm_stab", 0),
+    ("wing_area", "wing_area", 0),
+    ("timeout", "guidance_timeout", 0),
+]
+
+FIELD_NAMES = [attribute for attribute, key, default in PROFILE_FIELDS]
+
+
+class MissileProfile:
+    """Validated simulation parameters of one missile, with the constants derived from them.
+
+    Built once per missile when compiled_info.json is loaded. Supports
+    profile["key"] / profile.get("key") so code written for the old args
+    dict keeps working.
+    """
+    __slots__ = FIELD_NAMES + [
+        "name", "bullet_name",
+        "area", "Cl", "lofting", "loft_climb_angle", "loft_dive_angle", "loft_omega_rate",
+        "segments", "coast_mass", "content_hash", "_schedules",
+    ]
+
+    def __init__(self, name, bullet_name=None, **values):
+        self.name = name
+        self.bullet_name = bullet_name
+        for attribute, key, default in PROFILE_FIELDS:
+            value = values.get(attribute, default)
+            if attribute == "max_distance" and value is None:
+                self.max_distance = None
+                continue
+            if value is None:
+                raise ValueError(f"{name}: missing '{key}'")
+            value = float(value)
+            if not math.isfinite(value):
+                raise ValueError(f"{name}: '{key}' is not a finite number")
+            setattr(self, attribute, value)
+
+        if self.caliber <= 0 or self.mass <= 0 or self.mass_end_booster <= 0:
+            raise ValueError(f"{name}: caliber, mass and mass_end_booster must be positive")
+        if self.time_life < 0 or self.time_fire_booster < 0 or self.time_fire_sustainer < 0:
+            raise ValueError(f"{name}: time_life and burn times can't be negative")
+
+        self._derive()
+
+    def _derive(self):
+        self.area = np.pi * (self.caliber / 2) ** 2  # Cross section area
+
+        aoa = np.radians(self.aoa)
+        if 0 < aoa < np.pi/8 or 7*np.pi/8 < aoa < np.pi:
+            self.Cl = np.sin(6*aoa)
+        elif np.pi/8 <= aoa <= 7*np.pi/8:
+            self.Cl = np.sin(2*aoa)
+        else:
+            self.Cl = 0
+
+        # Loft angles in radians, loft turn rate in rad/s
+        self.lofting = bool(self.loft_elevation and self.loft_target_elevation and self.loft_omega_max != 0)
+        if self.lofting:
+            self.loft_climb_angle = np.radians(self.loft_elevation)
+            self.loft_dive_angle = np.radians(self.loft_target_elevation)
+            self.loft_omega_rate = np.radians(self.loft_omega_max*9)
+        else:
+            self.loft_climb_angle = self.loft_elevation
+            self.loft_dive_angle = self.loft_target_elevation
+            self.loft_omega_rate = 0.0
+
+        # Burn segments as (start, end, force, mass_start, mass_end)
+        self.segments = []
+        if self.time_fire_booster != 0:
+            self.segments.append((0.0, self.time_fire_booster, self.force_booster, self.mass, self.mass_end_booster))
+        if self.has_sustainer():
+            self.segments.append((self.time_fire_booster, self.time_fire_booster + self.time_fire_sustainer, self.force_sustainer, self.mass_end_booster, self.mass_end_sustainer))
+        self.coast_mass = self.mass_end_booster if self.mass_end_sustainer == 0 else self.mass_end_sustainer
+
+        values = repr([self.name] + [getattr(self, attribute) for attribute in FIELD_NAMES])
+        self.content_hash = hashlib.sha1(values.encode('utf-8')).hexdigest()
+        self._schedules = {}
+
+    @classmethod
+    def from_compiled_info(cls, name, data):
+        """Profile of one entry of compiled_info["data"]."""
+        values = {attribute: data.get(key, default) for attribute, key, default in PROFILE_FIELDS}
+        return cls(name, data.get("bullet_name"), **values)
+
+    @classmethod
+    def from_args(cls, args):
+        """Profile of a simulation args dict (as built by parse_arguments)."""
+        values = {attribute: args[attribute] for attribute in FIELD_NAMES if attribute in args}
+        return cls(args.get("name", args.get("bullet_name")), args.get("bullet_name"), **values)
+
+    def has_sustainer(self):
+        return self.time_fire_sustainer > 0 and self.force_sustainer > 0 and self.mass_end_sustainer > 0
+
+    def schedule(self, time_interval):
+        """Times, mass and thrust arrays for a fixed time_interval (cached)."""
+        if time_interval in self._schedules:
+            return self._schedules[time_interval]
+
+        times = np.arange(0, self.time_life + time_interval, time_interval)
+        n = len(times)
+        true_mass = np.full(n, self.coast_mass)
+        true_thrust = np.zeros(n)
+
+        # Segment 1: First phase burn
+        timefire_steps = int(np.ceil((self.time_fire_booster + time_interval) / time_interval)) if self.time_fire_booster != 0 else 0
+        if timefire_steps:
+            steps = np.arange(min(timefire_steps, n))
+            true_mass[:len(steps)] = self.mass - steps * ((self.mass - self.mass_end_booster) / (timefire_steps - 1))
+            true_thrust[:len(steps)] = self.force_booster
+
+        # Segment 2: Second phase burn (if applicable), Segment 3 (coasting) is the fill value
+        if self.has_sustainer():
+            timefire1_steps = int(np.ceil((self.time_fire_sustainer + time_interval) / time_interval))
+            steps = np.arange(min(timefire_steps + timefire1_steps, n) - timefire_steps)
+            true_mass[timefire_steps:timefire_steps + len(steps)] = self.mass_end_booster - steps * ((self.mass_end_booster - self.mass_end_sustainer) / (timefire1_steps - 1))
+            true_thrust[timefire_steps:timefire_steps + len(steps)] = self.force_sustainer
+
+        for array in (times, true_mass, true_thrust):
+            array.flags.writeable = False
+        self._schedules[time_interval] = (times, true_mass, true_thrust)
+        return self._schedules[time_interval]
+
+    def thrust_mass(self, t, segment):
+        """Thrust and mass at time t inside burn segment `segment` (len(segments) is the coast)."""
+        if segment < len(self.segments):
+            start, end, force, mass_start, mass_end = self.segments[segment]
+            return force, mass_start + (mass_end - mass_start) * (t - start) / (end - start)
+        return 0.0, self.coast_mass
+
+    def segment_at(self, t):
+        for index, segment in enumerate(self.segments):
+            if t < segment[1]:
+                return index
+        return len(self.segments)
+
+    def to_args(self):
+        args = {"name": self.name, "bullet_name": self.bullet_name}
+        args.update((attribute, getattr(self, attribute)) for attribute in FIELD_NAMES)
+        return args
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __getstate__(self):
+        return self.to_args()
+
+    def __setstate__(self, state):
+        self.name = state["name"]
+        self.bullet_name = state["bullet_name"]
+        for attribute in FIELD_NAMES:
+            setattr(self, attribute, state[attribute])
+        self._derive()
+
+    def __repr__(self):
+        return f"MissileProfile({self.name!r})"
+
+
+def as_profile(args):
+    """Accept either a MissileProfile or an args dict."""
+    return args if isinstance(args, MissileProfile) else MissileProfile.from_args(args)
+
+def build_profiles(blk_files_info):
+    """Profiles for every entry of compiled_info["data"], skipping invalid entries."""
+    profiles = {}
+    for name, data in blk_files_info.items():
+        try:
+            profiles[name] = MissileProfile.from_compiled_info(name, data)
+        except (TypeError, ValueError) as e:
+            print(f"Skipping {name}: {e}")
+    return profiles
+
+class LazyProfiles(Mapping):
+    """{name: MissileProfile} over a catalogue, each profile built on first access.
+
+    Loading costs nothing per missile, only the missiles actually simulated
+    are read from the catalogue. Invalid entries are reported once and then
+    behave as missing (KeyError, `name in profiles` is False).
+    """
+
+    def __init__(self, blk_files_info):
+        self.blk_files_info = blk_files_info
+        self.profiles = {}
+        self.invalid = set()
+
+    def __getitem__(self, name):
+        if name in self.profiles:
+            return self.profiles[name]
+        if name in self.invalid or name not in self.blk_files_info:
+            raise KeyError(name)
+        try:
+            profile = MissileProfile.from_compiled_info(name, self.blk_files_info[name])
+        except (TypeError, ValueError) as e:
+            print(f"Skipping {name}: {e}")
+            self.invalid.add(name)
+            raise KeyError(name)
+        self.profiles[name] = profile
+        return profile
+
+    def __iter__(self):
+        return iter(self.blk_files_info)
+
+    def __len__(self):
+        return len(self.blk_files_info)
@@ -0,0 +1,144 @@
+import re
+import operator
+import numpy as np
+
+# Filter tokens look like mass<100, time_fire_booster>=3 or drag/weight!=0
+FILTER_PATTERN = re.compile(r'^([a-z_][\w/]*?)(<=|>=|!=|==|<|>|=)(-?\d*\.?\d+(?:e-?\d+)?)?$')
+OPERATORS = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+    "=": operator.eq, "==": operator.eq, "!=": operator.ne,
+}
+
+def field_key(field):
+    return field.lower().replace(' ', '_')
+
+class SearchIndex:
+    """Search over the missile names with numeric filters on their fields.
+
+    A query is whitespace separated tokens: text tokens must all appear in
+    the name (case-insensitive), filter tokens like mass<100 compare a field
+    of the record. Names are looked up through a trigram index, and a query
+    that extends the previous one only narrows the previous result.
+    search() returns indices into names, in catalogue order.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.names = list(data)
+        self.lower_names = [name.lower() for name in self.names]
+        self.all_indices = np.arange(len(self.names))
+
+        fields = getattr(data, "fields", None)
+        if fields is None:
+            fields = list(dict.fromkeys(field for record in data.values() for field in record))
+        self.fields = {field_key(field): field for field in fields}
+        self.columns = {}
+
+        trigrams = {}
+        for index, name in enumerate(self.lower_names):
+            for start in range(len(name) - 2):
+                trigrams.setdefault(name[start:start + 3], set()).add(index)
+        self.trigrams = {trigram: np.array(sorted(indices)) for trigram, indices in trigrams.items()}
+        self._last = {}
+
+    def column(self, field):
+        """Values of field as floats for every missile, NaN where missing or not a number."""
+        if field not in self.columns:
+            if hasattr(self.data, "column"):
+                values = np.full(len(self.names), np.nan)
+                if self.data.kinds[field] in ("int", "float"):
+                    number = self.data.fields.index(field)
+                    values = np.asarray(self.data.column(field), dtype=float).copy()
+                    values[~np.asarray(self.data.present[:, number]) | np.asarray(self.data.nulls[:, number])] = np.nan
+            else:
+                values = np.full(len(self.names), np.nan)
+                for index, name in enumerate(self.names):
+                    value = self.data[name].get(field)
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        values[index] = value
+            self.columns[field] = values
+        return self.columns[field]
+
+    def parse(self, query):
+        """(kind, token) for each token: kind is "text", "filter" (field, op, value) or "partial" (filter still being typed)."""
+        tokens = []
+        for token in query.lower().split():
+            match = FILTER_PATTERN.match(token)
+            if match and match.group(1) in self.fields:
+                field = self.fields[match.group(1)]
+                if match.group(3) is None:
+                    tokens.append(("partial", token))
+                else:
+                    tokens.append(("filter", (field, match.group(2), float(match.group(3)))))
+            else:
+                tokens.append(("text", token))
+        return tokens
+
+    def _text_candidates(self, text):
+        # Candidates of a token are the names holding all of its trigrams
+        candidates = None
+        for token in text:
+            for start in range(len(token) - 2):
+                indices = self.trigrams.get(token[start:start + 3])
+                if indices is None:
+                    return self.all_indices[:0]
+                candidates = indices if candidates is None else np.intersect1d(candidates, indices, assume_unique=True)
+        return self.all_indices if candidates is None else candidates
+
+    def _narrows(self, previous_query, previous_tokens, query, tokens):
+        # Extending the query only narrows the result if the extended token keeps its kind
+        if not query.lower().startswith(previous_query.lower()) or len(tokens) < len(previous_tokens):
+            return False
+        if not previous_tokens:
+            return True
+        if previous_query[-1:].isspace():
+            return previous_tokens == tokens[:len(previous_tokens)]
+        last = len(previous_tokens) - 1
+        return previous_tokens[:last] == tokens[:last] and previous_tokens[last][0] == "text" and tokens[last][0] == "text"
+
+    def search(self, query, context=None):
+        """Indices of the names matching query. context keeps a separate previous query (e.g. per listbox)."""
+        tokens = self.parse(query)
+        text = [token for kind, token in tokens if kind == "text"]
+        filters = [token for kind, token in tokens if kind == "filter"]
+
+        previous = self._last.get(context)
+        if previous is not None and self._narrows(previous[0], previous[1], query, tokens):
+            candidates = previous[2]
+        else:
+            candidates = self._text_candidates(text)
+
+        keep = np.array([all(token in self.lower_names[index] for token in text) for index in candidates], dtype=bool)
+        for field, op, value in filters:
+            with np.errstate(invalid="ignore"):
+                values = self.column(field)[candidates]
+                keep &= OPERATORS[op](values, value) & ~np.isnan(values)
+        result = candidates[keep]
+
+        self._last[context] = (query, tokens, result)
+        return result
+
+def sync_listbox(listbox, names, shown, wanted):
+    """Turn a listbox showing names[shown] into names[wanted] with a few deletes and inserts.
+
+    shown and wanted are ascending index lists, runs of removed or added
+    names are changed with one Tk call each.
+    """
+    position = 0
+    i = j = 0
+    while i < len(shown) or j < len(wanted):
+        if j < len(wanted) and (i == len(shown) or wanted[j] < shown[i]):
+            start = j
+            while j < len(wanted) and (i == len(shown) or wanted[j] < shown[i]):
+                j += 1
+            listbox.insert(position, *(names[index] for index in wanted[start:j]))
+            position += j - start
+        elif i < len(shown) and (j == len(wanted) or shown[i] < wanted[j]):
+            start = i
+            while i < len(shown) and (j == len(wanted) or shown[i] < wanted[j]):
+                i += 1
+            listbox.delete(position, position + i - start - 1)
+        else:
+            i += 1
+            j += 1
+            position += 1
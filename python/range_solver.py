@@ -0,0 +1,107 @@
+import hashlib
+from collections import OrderedDict
+from graph_maker_missile import compute_dependent_variables
+from cancellation import SimulationCancelled
+from missile_profile import as_profile
+from stop_conditions import UNTIL_OUTCOME
+
+# Launch range solver: the largest initial target distance at which a missile still reaches the target.
+#   max range        target flying towards the launcher at its speed (negative target speed)
+#   no-escape range  target turning away and running at its speed (positive target speed)
+# Distances are in km and speeds in km/h, like the main window inputs.
+
+# Largest distance searched (km), targets further away count as out of range
+SEARCH_LIMIT = 1000.0
+# First bracket guess (km), doubled until a probe misses
+FIRST_GUESS = 10.0
+
+def intercepts(profile, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator="fixed", cancel_event=None):
+    """One probe: True if the missile reaches the target. The simulation stops as soon as that is decided."""
+    if initial_target_distance <= 0:
+        return True
+    try:
+        results = compute_dependent_variables(profile, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude,
+                                              integrator, cancel_event, UNTIL_OUTCOME)
+    except SimulationCancelled:
+        raise
+    except ValueError:
+        # The flight left the atmosphere tables before reaching the target
+        return False
+    horizontal_distances = results[7]
+    target_distances = results[9]
+    return bool(horizontal_distances[-1] >= target_distances[-1])
+
+def max_launch_distance(profile, start_speed, launch_altitude, target_speed, target_altitude, tolerance=0.01, integrator="fixed", cancel_event=None):
+    """Largest initial target distance (km) at which the target is reached, within tolerance (km).
+
+    The bracket is found by doubling a first guess, then bisected. Assumes a
+    target reached at some distance is also reached at any shorter one.
+    Returns (distance, number of probes); distance is SEARCH_LIMIT when every
+    probe reached the target.
+    """
+    probes = 0
+    low = 0.0
+    high = FIRST_GUESS
+    while True:
+        probes += 1
+        if not intercepts(profile, start_speed, launch_altitude, target_speed, high, target_altitude, integrator, cancel_event):
+            break
+        low = high
+        if high >= SEARCH_LIMIT:
+            return SEARCH_LIMIT, probes
+        high = min(high * 2, SEARCH_LIMIT)
+
+    while high - low > tolerance:
+        middle = (low + high) / 2
+        probes += 1
+        if intercepts(profile, start_speed, launch_altitude, target_speed, middle, target_altitude, integrator, cancel_event):
+            low = middle
+        else:
+            high = middle
+    return low, probes
+
+class RangeSolver:
+    """Max range and no-escape range per missile and launch conditions, memoized in memory.
+
+    Entries are keyed by the missile's parameter hash, the conditions, the
+    tolerance and the integrator; set_version() drops them all.
+    """
+
+    def __init__(self, version=None, tolerance=0.01, max_entries=512):
+        self.tolerance = tolerance
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.probes = 0
+        self.set_version(version)
+
+    def set_version(self, version):
+        self.version = str(version)
+        self.memory.clear()
+
+    def key(self, profile, start_speed, launch_altitude, target_speed, target_altitude, integrator="fixed"):
+        conditions = repr([float(start_speed), float(launch_altitude), float(target_speed), float(target_altitude), float(self.tolerance)])
+        text = f"{self.version}|{profile.content_hash}|{conditions}|{integrator}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def launch_distance(self, args, start_speed, launch_altitude, target_speed, target_altitude, integrator="fixed", cancel_event=None):
+        """max_launch_distance, answered from the cache when possible."""
+        profile = as_profile(args)
+        key = self.key(profile, start_speed, launch_altitude, target_speed, target_altitude, integrator)
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+
+        distance, probes = max_launch_distance(profile, start_speed, launch_altitude, target_speed, target_altitude, self.tolerance, integrator, cancel_event)
+        self.probes += probes
+        self.memory[key] = distance
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+        return distance
+
+    def solve(self, args, start_speed, launch_altitude, target_speed, target_altitude, integrator="fixed", cancel_event=None):
+        """{"max_range", "no_escape_range"} in km against a target at abs(target_speed) km/h and target_altitude m."""
+        target_speed = abs(target_speed)
+        return {
+            "max_range": self.launch_distance(args, start_speed, launch_altitude, -target_speed if target_speed else 0.0, target_altitude, integrator, cancel_event),
+            "no_escape_range": self.launch_distance(args, start_speed, launch_altitude, target_speed, target_altitude, integrator, cancel_event),
+        }
@@ -0,0 +1,140 @@
+import os
+import re
+import shutil
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from graph_maker_missile import compute_dependent_variables
+from missile_profile import as_profile
+
+# Names of the arrays returned by compute_dependent_variables, in order
+RESULT_FIELDS = [
+    "times", "true_mass", "true_thrust", "tas_speed", "mach_numbers", "drags", "accelerations", "horizontal_distances",
+    "vertical_distances", "target_distances", "thrust_to_weights", "g_load", "turn_radius", "turn_rates",
+]
+
+# Version of the flight model, the integrators and RESULT_FIELDS. Bump it with any change to the
+# simulation results, disk entries of another model version are deleted when the cache opens.
+MODEL_VERSION = 2
+
+class SimulationCache:
+    """LRU memoization of compute_dependent_variables, backed by .npz files on disk.
+
+    Entries are keyed by the missile's parameter hash, the launch conditions,
+    the integrator, the game version and MODEL_VERSION. Opening the cache for
+    a new version deletes the disk entries of every other version. The disk
+    keeps the max_disk_entries most recently used entries.
+    """
+
+    def __init__(self, directory, version, max_entries=64, max_disk_entries=512):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.set_version(version)
+
+    def set_version(self, version):
+        self.version = str(version)
+        self.memory.clear()
+        if self.directory is None:
+            self.version_directory = None
+            return
+
+        self.version_directory = os.path.join(self.directory, f"model{MODEL_VERSION}_" + re.sub(r'[^A-Za-z0-9._-]', '_', self.version))
+        try:
+            os.makedirs(self.version_directory, exist_ok=True)
+            for entry in os.listdir(self.directory):
+                path = os.path.join(self.directory, entry)
+                if path != self.version_directory and os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+        except OSError as e:
+            print(f"Error preparing simulation cache {self.directory}: {e}")
+            self.version_directory = None
+
+    def key(self, profile, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator="fixed", stop=None):
+        conditions = repr([float(start_speed), float(launch_altitude), float(target_speed), float(initial_target_distance), float(target_altitude)])
+        text = f"{self.version}|{profile.content_hash}|{conditions}|{integrator}"
+        # Full flights keep their keys from before stop conditions existed
+        if stop is not None and stop.any():
+            text += f"|{stop.key()}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+
+        if self.version_directory is not None:
+            path = os.path.join(self.version_directory, f"{key}.npz")
+            if os.path.exists(path):
+                try:
+                    with np.load(path) as archive:
+                        results = tuple(archive[field] for field in RESULT_FIELDS)
+                except Exception as e:
+                    print(f"Error reading cached simulation {path}: {e}")
+                    return None
+                # The modification time orders the disk entries for eviction
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                self._remember(key, results)
+                return results
+        return None
+
+    def put(self, key, results):
+        results = tuple(np.array(values, dtype=float) for values in results)
+        self._remember(key, results)
+
+        if self.version_directory is not None:
+            path = os.path.join(self.version_directory, f"{key}.npz")
+            temporary_path = path + ".tmp.npz"
+            try:
+                np.savez(temporary_path, **dict(zip(RESULT_FIELDS, results)))
+                os.replace(temporary_path, path)
+                self._evict_disk()
+            except OSError as e:
+                print(f"Error writing cached simulation {path}: {e}")
+        return results
+
+    def _evict_disk(self):
+        # Least recently used entries first
+        entries = [entry.path for entry in os.scandir(self.version_directory) if entry.name.endswith('.npz')]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remember(self, key, results):
+        # Cached arrays are shared between callers
+        for values in results:
+            values.flags.writeable = False
+        self.memory[key] = results
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def compute(self, args, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator="fixed", cancel_event=None, stop=None):
+        """compute_dependent_variables, answered from the cache when possible."""
+        profile = as_profile(args)
+        key = self.key(profile, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator, stop)
+        results = self.get(key)
+        if results is not None:
+            self.hits += 1
+            return results
+
+        self.misses += 1
+        results = compute_dependent_variables(profile, start_speed, launch_altitude, target_speed, initial_target_distance, target_altitude, integrator, cancel_event, stop)
+        return self.put(key, results)
+
+    def clear(self):
+        self.memory.clear()
+        if self.version_directory is not None:
+            shutil.rmtree(self.version_directory, ignore_errors=True)
+            os.makedirs(self.version_directory, exist_ok=True)
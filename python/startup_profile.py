@@ -0,0 +1,76 @@
+import builtins
+import sys
+import time
+import instrumentation
+
+class StartupProfile:
+    """Import and phase timings of the GUI startup, for --profile-startup.
+
+    While enabled, every import that loads a new module is timed (nested
+    imports are included in their parent's time). phase(name) marks the end
+    of a startup phase, report() prints both and stops timing imports.
+    """
+
+    def __init__(self, enabled=False, max_depth=2):
+        self.enabled = enabled
+        self.max_depth = max_depth
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []
+        self.imports = []
+        self._depth = 0
+        self._original_import = builtins.__import__
+        if enabled:
+            builtins.__import__ = self._import
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        # The entry is reserved before the import so the list stays in import order
+        depth = self._depth
+        index = len(self.imports)
+        if depth < self.max_depth:
+            self.imports.append(None)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            if depth < self.max_depth:
+                self.imports[index] = (depth, name, time.perf_counter() - start)
+
+    def phase(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        # The phases are also spans of the trace when instrumentation is enabled
+        instrumentation.tracer.record(f"startup: {name}", self.last, now)
+        self.last = now
+
+    def total(self):
+        return self.last - self.start
+
+    def benchmark_results(self):
+        """The phase timings in benchmark.py's results format, one "startup_phase_<phase>" entry per phase."""
+        results = {}
+        for name, seconds in self.phases + [("time to first window", self.total())]:
+            results["startup_phase_" + name.replace(" ", "_")] = {"median": seconds, "min": seconds, "repeat": 1}
+        return results
+
+    def report(self):
+        """Print the timings and return the total time in seconds."""
+        builtins.__import__ = self._original_import
+        if not self.enabled:
+            return self.total()
+
+        print("Startup phases:")
+        for name, seconds in self.phases:
+            print(f"  {name:<30} {seconds * 1000:8.1f} ms")
+        print(f"  {'time to first window':<30} {self.total() * 1000:8.1f} ms")
+
+        print("Imports (new modules, nested imports included in their parent):")
+        for depth, name, seconds in self.imports:
+            if seconds >= 0.001:
+                print(f"  {'  ' * depth}{name:<{30 - 2 * depth}} {seconds * 1000:8.1f} ms")
+        return self.total()
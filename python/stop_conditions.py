@@ -0,0 +1,40 @@
+# When a simulation may end before time_life or max_distance. The graphs fly the
+# whole flight by default, sweeps and range probes only need it up to the outcome.
+
+class StopConditions:
+    """Stop conditions of compute_dependent_variables.
+
+    intercept  the missile reaches the target (only with an initial target distance > 0)
+    closing    the closing speed on the target is <= 0 after motor burnout
+    kill_speed the true airspeed is below kill_speed (m/s) after motor burnout, 0 is off
+    ground     the altitude is <= 0
+    """
+    __slots__ = ("intercept", "closing", "kill_speed", "ground")
+
+    def __init__(self, intercept=False, closing=False, kill_speed=0.0, ground=False):
+        self.intercept = bool(intercept)
+        self.closing = bool(closing)
+        self.kill_speed = float(kill_speed)
+        self.ground = bool(ground)
+
+    def any(self):
+        return self.intercept or self.closing or self.kill_speed > 0 or self.ground
+
+    def key(self):
+        """Text for cache keys, empty when nothing stops the flight early."""
+        if not self.any():
+            return ""
+        return repr([self.intercept, self.closing, self.kill_speed, self.ground])
+
+    def __repr__(self):
+        return f"StopConditions(intercept={self.intercept}, closing={self.closing}, kill_speed={self.kill_speed}, ground={self.ground})"
+
+# Flight up to the outcome against the target: intercept, or the target can't be caught any more
+UNTIL_OUTCOME = StopConditions(intercept=True, closing=True, ground=True)
+
+def parse_stop_conditions(names, kill_speed=0.0):
+    """StopConditions from a list of names ("intercept", "closing", "ground") and a kill speed (m/s)."""
+    unknown = set(names) - {"intercept", "closing", "ground"}
+    if unknown:
+        raise ValueError(f"Unknown stop conditions: {', '.join(sorted(unknown))}")
+    return StopConditions("intercept" in names, "closing" in names, kill_speed, "ground" in names)
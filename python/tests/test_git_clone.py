@@ -0,0 +1,87 @@
+import os
+import subprocess
+import pytest
+import git_clone
+
+# Datamine layout in miniature: two checked-out folders and one that stays outside the sparse checkout
+FOLDER_PATHS = ["gamedata/rocketguns", "lang"]
+
+def git(directory, *args):
+    return subprocess.run(["git", "-C", str(directory)] + list(args), check=True, stdout=subprocess.PIPE, text=True).stdout.strip()
+
+def write(root, path, text):
+    full_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'w') as file:
+        file.write(text)
+
+def commit(work, message):
+    git(work, "add", "-A")
+    git(work, "commit", "-q", "-m", message)
+    git(work, "push", "-q", "--force", "origin", "main")
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    """A bare origin with one commit, and the working clone the test commits from."""
+    for name in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(name, "test")
+    for name in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(name, "test@example.com")
+
+    bare = tmp_path / "origin.git"
+    subprocess.run(["git", "init", "-q", "--bare", "--initial-branch=main", str(bare)], check=True)
+    work = tmp_path / "work"
+    subprocess.run(["git", "clone", "-q", str(bare), str(work)], check=True, stderr=subprocess.DEVNULL)
+    git(work, "checkout", "-q", "-b", "main")
+    write(work, "gamedata/rocketguns/aim_9.blkx", "{}")
+    write(work, "gamedata/rocketguns/r_60.blkx", "{}")
+    write(work, "lang/units_weaponry.csv", "id;english\n")
+    write(work, "gamedata/aircraft/f_16.blkx", "{}")
+    commit(work, "first")
+    return bare.as_uri(), work
+
+def test_update_returns_changed_files(origin, tmp_path):
+    url, work = origin
+    local_dir = str(tmp_path / "rocketguns_json")
+    git_clone.clone_repo(url, local_dir, FOLDER_PATHS)
+    assert os.path.exists(os.path.join(local_dir, "gamedata/rocketguns/aim_9.blkx"))
+    assert not os.path.exists(os.path.join(local_dir, "gamedata/aircraft/f_16.blkx"))
+
+    write(work, "gamedata/rocketguns/aim_9.blkx", '{"mass": 85}')
+    write(work, "gamedata/rocketguns/mica.blkx", "{}")
+    os.remove(os.path.join(work, "gamedata/rocketguns/r_60.blkx"))
+    write(work, "lang/units_weaponry.csv", "id;english\naim_9;AIM-9\n")
+    write(work, "gamedata/aircraft/f_16.blkx", '{"changed": true}')
+    commit(work, "second")
+
+    assert git_clone.update_specific_folders(FOLDER_PATHS, local_dir) == [
+        ("M", "gamedata/rocketguns/aim_9.blkx"),
+        ("A", "gamedata/rocketguns/mica.blkx"),
+        ("D", "gamedata/rocketguns/r_60.blkx"),
+        ("M", "lang/units_weaponry.csv"),
+    ]
+    with open(os.path.join(local_dir, "gamedata/rocketguns/aim_9.blkx")) as file:
+        assert file.read() == '{"mass": 85}'
+
+    # Nothing new upstream
+    assert git_clone.update_repo(url, local_dir, FOLDER_PATHS) == []
+
+def test_update_without_fast_forward_clones_again(origin, tmp_path):
+    url, work = origin
+    local_dir = str(tmp_path / "rocketguns_json")
+    git_clone.clone_repo(url, local_dir, FOLDER_PATHS)
+
+    # Rewritten upstream history: the clone's HEAD is no ancestor of the new one
+    write(work, "gamedata/rocketguns/aim_9.blkx", '{"mass": 90}')
+    git(work, "add", "-A")
+    git(work, "commit", "-q", "--amend", "-m", "rewritten")
+    git(work, "push", "-q", "--force", "origin", "main")
+
+    assert git_clone.update_specific_folders(FOLDER_PATHS, local_dir) is None
+    assert git_clone.update_repo(url, local_dir, FOLDER_PATHS) is None
+    assert git(local_dir, "rev-parse", "HEAD") == git(work, "rev-parse", "HEAD")
+    with open(os.path.join(local_dir, "gamedata/rocketguns/aim_9.blkx")) as file:
+        assert file.read() == '{"mass": 90}'
+
+def test_update_of_a_missing_clone(tmp_path):
+    assert git_clone.update_specific_folders(FOLDER_PATHS, str(tmp_path / "missing")) is None
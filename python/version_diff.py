@@ -0,0 +1,136 @@
+import math
+import numpy as np
+
+# Launch conditions of the range re-simulation: the main window's defaults
+# (start speed, launch altitude, target speed, target distance, target altitude)
+RANGE_CONDITIONS = (1224, 1000, 0, 0, 1000)
+RANGE_FIELD = "range (simulated)"
+
+class FieldChange:
+    """One changed field of one missile. delta and percent are None unless both values are numbers."""
+    __slots__ = ("missile", "field", "old", "new", "delta", "percent")
+
+    def __init__(self, missile, field, old, new, delta=None, percent=None):
+        self.missile = missile
+        self.field = field
+        self.old = old
+        self.new = new
+        self.delta = delta
+        self.percent = percent
+
+    def impact(self):
+        # Relative change first, changes from 0 count as infinite and non-numeric changes come last
+        return -1.0 if self.percent is None else abs(self.percent)
+
+    def __repr__(self):
+        return f"FieldChange({self.missile!r}, {self.field!r}, {self.old!r} -> {self.new!r})"
+
+class VersionDiff:
+    """Missiles added and removed between two versions and the field changes of the others."""
+
+    def __init__(self, version1, version2, added, removed, changes):
+        self.version1 = version1
+        self.version2 = version2
+        self.added = added
+        self.removed = removed
+        self.changes = changes
+
+    def changed_missiles(self):
+        return sorted({change.missile for change in self.changes})
+
+    def sorted(self, key="impact", reverse=True):
+        """Changes sorted by impact (largest relative change first) or by a FieldChange attribute."""
+        if key == "impact":
+            return sorted(self.changes, key=FieldChange.impact, reverse=reverse)
+        # None and text values sort after the numbers
+        def sort_key(change):
+            value = getattr(change, key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return (0, value, "")
+            return (1, 0, "" if value is None else str(value))
+        return sorted(self.changes, key=sort_key, reverse=reverse)
+
+    def field_summary(self):
+        """{field: number of missiles where it changed}"""
+        summary = {}
+        for change in self.changes:
+            summary[change.field] = summary.get(change.field, 0) + 1
+        return summary
+
+def _numbers(values):
+    return np.array([value if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan for value in values], dtype=float)
+
+def diff_versions(data1, data2, version1=None, version2=None, names=None):
+    """Field-level diff of two catalogues ({missile name: record}).
+
+    Each field is compared as a column over all missiles present in both
+    versions. names limits the comparison to those missiles (e.g. the
+    changed ones reported by the history store).
+    """
+    added = sorted(name for name in data2 if name not in data1)
+    removed = sorted(name for name in data1 if name not in data2)
+    if names is None:
+        names = [name for name in data1 if name in data2]
+    else:
+        names = [name for name in names if name in data1 and name in data2]
+
+    records1 = [data1[name] for name in names]
+    records2 = [data2[name] for name in names]
+    fields = list(dict.fromkeys(field for record in records1 + records2 for field in record))
+
+    changes = []
+    for field in fields:
+        old = [record.get(field) for record in records1]
+        new = [record.get(field) for record in records2]
+        old_numbers = _numbers(old)
+        new_numbers = _numbers(new)
+        numeric = ~np.isnan(old_numbers) & ~np.isnan(new_numbers)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta = new_numbers - old_numbers
+            percent = np.where(old_numbers != 0, delta / np.abs(old_numbers) * 100, np.sign(delta) * np.inf)
+
+        changed = np.flatnonzero(numeric & (delta != 0))
+        for row in changed:
+            changes.append(FieldChange(names[row], field, old[row], new[row], float(delta[row]), float(percent[row])))
+        # Text fields, missing fields and fields that stopped being numbers
+        for row in np.flatnonzero(~numeric):
+            if old[row] != new[row]:
+                changes.append(FieldChange(names[row], field, old[row], new[row]))
+
+    return VersionDiff(version1, version2, added, removed, changes)
+
+def range_changes(diff, data1, data2, conditions=RANGE_CONDITIONS, max_workers=None, progress=None, cancel_event=None):
+    """Simulate the changed missiles of diff in both versions and add their range differences to diff.changes.
+
+    Missiles that can't be simulated in one of the versions are skipped.
+    Returns the FieldChanges added.
+    """
+    from envelope_sweep import sweep_envelope
+    from missile_profile import MissileProfile
+
+    names = []
+    profiles = []
+    for name in diff.changed_missiles():
+        try:
+            old_profile = MissileProfile.from_compiled_info(name, data1[name])
+            new_profile = MissileProfile.from_compiled_info(name, data2[name])
+        except (ValueError, TypeError) as e:
+            print(f"Skipping range of {name}: {e}")
+            continue
+        names.append(name)
+        profiles.extend((old_profile, new_profile))
+    if not profiles:
+        return []
+
+    sweep = sweep_envelope(profiles, *conditions, max_workers=max_workers, progress=progress, cancel_event=cancel_event)
+    ranges = sweep["range"].reshape(len(names), 2)
+
+    added = []
+    for name, (old_range, new_range) in zip(names, ranges):
+        if math.isnan(old_range) or math.isnan(new_range) or old_range == new_range:
+            continue
+        delta = float(new_range - old_range)
+        percent = delta / abs(old_range) * 100 if old_range else math.copysign(math.inf, delta)
+        added.append(FieldChange(name, RANGE_FIELD, float(old_range), float(new_range), delta, percent))
+    diff.changes.extend(added)
+    return added